@@ -0,0 +1,108 @@
+import streamlit as st
+import pandas as pd
+from app_pages.data import add_commission_rule
+from app_pages.frames import get_commission_rules_frame, get_product_ids, run_scenarios
+
+def commission_rules_page():
+    """Commission rules management page"""
+    st.title("⚙️ Commission Rules Management")
+    
+    # Add/Edit commission rule form
+    st.subheader("➕ Add/Edit Commission Rule")
+    
+    with st.form("commission_rule_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            product_name = st.text_input("Product Name", value="New Product")
+            commission_rate = st.number_input("Commission Rate (%)", min_value=0.1, max_value=50.0, value=10.0, step=0.5)
+        
+        with col2:
+            min_amount = st.number_input("Minimum Sale Amount ($)", min_value=0.0, value=0.0, step=100.00)
+            max_amount = st.number_input("Maximum Sale Amount ($) - Leave 0 for no limit", min_value=0.0, value=0.0, step=1000.00)
+        
+        submit = st.form_submit_button("💾 Save Commission Rule", use_container_width=True)
+        
+        if submit:
+            if product_name and commission_rate > 0:
+                max_amt = max_amount if max_amount > 0 else None
+                if add_commission_rule(product_name, commission_rate, min_amount, max_amt):
+                    st.success(f"✅ Commission rule saved for {product_name}: {commission_rate}%")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to save commission rule")
+            else:
+                st.error("Please fill in required fields")
+    
+    st.markdown("---")
+    
+    # Display existing commission rules
+    st.subheader("📋 Current Commission Rules")
+    df = get_commission_rules_frame(['product_name', 'commission_rate', 'min_amount', 'max_amount'])
+    
+    if not df.empty:
+        display_df = df.astype({'max_amount': object}).fillna({'max_amount': 'No Limit'})
+        display_df.columns = ['Product', 'Commission Rate (%)', 'Min Amount ($)', 'Max Amount ($)']
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("No commission rules found")
+    
+    st.markdown("---")
+    what_if_section()
+
+def what_if_section():
+    """Simulate candidate rules against every past sale without saving them"""
+    st.subheader("🧪 What-if Simulator")
+    st.caption("Compare payouts under candidate rules before saving them. Rows with the same "
+               "scenario name form one rule set; sales of other products keep their current "
+               "commission. Nothing is written to the database.")
+    
+    products = sorted(get_product_ids())
+    if not products:
+        st.info("No products found")
+        return
+    
+    candidates = st.data_editor(
+        pd.DataFrame({
+            'Scenario': ['Scenario 1'],
+            'Product': [products[0]],
+            'Commission Rate (%)': [10.0],
+            'Min Amount ($)': [0.0],
+            'Max Amount ($)': [0.0],
+        }),
+        column_config={
+            'Product': st.column_config.SelectboxColumn(options=products, required=True),
+            'Commission Rate (%)': st.column_config.NumberColumn(min_value=0.0, max_value=50.0, step=0.5),
+            'Max Amount ($)': st.column_config.NumberColumn(help="0 for no limit"),
+        },
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key="what_if_rules",
+    )
+    
+    if st.button("▶️ Run Simulation", use_container_width=True):
+        scenarios = {}
+        for row in candidates.dropna(subset=['Scenario', 'Product', 'Commission Rate (%)']).itertuples(index=False):
+            scenario, product, rate, min_amount, max_amount = row
+            scenarios.setdefault(scenario, []).append({
+                'product_name': product,
+                'commission_rate': rate,
+                'min_amount': 0 if pd.isna(min_amount) else min_amount,
+                'max_amount': max_amount if max_amount and not pd.isna(max_amount) else None,
+            })
+        if not scenarios:
+            st.error("Please add at least one candidate rule")
+            return
+        
+        with st.spinner("Simulating..."):
+            summary, by_rep, by_product = run_scenarios(scenarios)
+        
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Change per salesperson**")
+            st.dataframe(by_rep, use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown("**Change per product**")
+            st.dataframe(by_product, use_container_width=True, hide_index=True)
@@ -0,0 +1,144 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import date, timedelta
+from backend.leaderboard import ALL_TIME
+from backend.timeseries import BUCKETS, choose_bucket, downsample_series
+from app_pages.data import (
+    get_sales_stats, get_leaderboards, get_sale_date_range, get_sales_trend
+)
+from app_pages.frames import get_sales_frame
+
+def dashboard_page():
+    """Dashboard page"""
+    user = st.session_state.user
+    is_admin = user['role'] == 'admin'
+    
+    st.title(f"📊 Sales Dashboard - Welcome {user['username']}!")
+    
+    # Get data based on role
+    user_id = None if is_admin else user['id']
+    stats = get_sales_stats(user_id)
+    if is_admin:
+        st.info("👨‍💼 **Admin View**: Showing all sales data across the organization")
+    else:
+        st.info("👤 **Personal View**: Showing your sales data only")
+    
+    # Display metrics
+    if stats and stats.get('total_sales', 0) > 0:
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("🎯 Total Sales", stats.get('total_sales', 0))
+        with col2:
+            st.metric("💰 Total Revenue", f"${stats.get('total_amount', 0):,.2f}")
+        with col3:
+            st.metric("💵 Total Commission", f"${stats.get('total_commission', 0):,.2f}")
+        with col4:
+            st.metric("📊 Average Sale", f"${stats.get('average_sale', 0):,.2f}")
+        
+        st.markdown("---")
+        
+        # Charts and tables only load the selected window, so they only touch
+        # the partitions it overlaps
+        window = select_date_window(user_id)
+        display_cols = ['customer_name', 'product_name', 'amount', 'commission_amount', 'sale_date']
+        if is_admin:
+            display_cols.append('salesperson')
+        
+        df = get_sales_frame(display_cols, user_id, *window) if window else None
+        if df is not None and not df.empty:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Sales over time
+                st.subheader("📅 Sales Trend")
+                sales_trend_chart(user_id, *window)
+            
+            with col2:
+                # Product performance
+                st.subheader("🏆 Product Performance")
+                product_sales = df.groupby('product_name', observed=True)['amount'].sum().sort_values(ascending=False)
+                
+                fig = px.pie(values=product_sales.values, names=product_sales.index, 
+                            title='Sales by Product')
+                st.dataframe(df, width="content")
+
+            
+            # Sales table
+            st.subheader("📋 Recent Sales Records")
+            recent_sales = df[display_cols].head(10)
+            st.dataframe(recent_sales, width="stretch", hide_index=True)
+            
+            st.markdown("---")
+            leaderboard_section(user, is_admin)
+
+    else:
+        st.info("📝 No sales data available")
+
+def select_date_window(user_id=None):
+    """Date range picker defaulting to the year up to the latest sale; returns (start, end) or None"""
+    first, last = get_sale_date_range(user_id)
+    if not first:
+        return None
+    first, last = date.fromisoformat(first), date.fromisoformat(last)
+    default_start = max(first, last - timedelta(days=364))
+    
+    window = st.date_input("📆 Date range", value=(default_start, last),
+                           min_value=first, max_value=last, key="dashboard_range")
+    if len(window) != 2:
+        st.info("Select an end date")
+        return None
+    return window
+
+def sales_trend_chart(user_id, start, end):
+    """Sales over time for a selected window, bucketed and downsampled in the query"""
+    granularity = st.selectbox("Granularity", ["auto"] + list(BUCKETS),
+                               format_func=str.title, key="trend_bucket")
+    bucket = choose_bucket(start, end) if granularity == "auto" else granularity
+    
+    trend = get_sales_trend(start, end, bucket, user_id)
+    periods, amounts = downsample_series([p for p, _ in trend], [a for _, a in trend])
+    
+    fig = px.line(x=periods, y=amounts, labels={'x': 'Period', 'y': 'Amount'},
+                 title=f'Sales Over Time (by {bucket})', markers=len(periods) <= 100)
+    st.plotly_chart(fig, use_container_width=True)
+
+def leaderboard_section(user, is_admin):
+    """Top reps, products and customers for a period"""
+    st.subheader("🥇 Leaderboards")
+    store = get_leaderboards()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.selectbox("Period", [ALL_TIME] + store.periods(),
+                              format_func=lambda p: "All Time" if p == ALL_TIME else p)
+    with col2:
+        metric = st.radio("Rank by", ["amount", "commission"], horizontal=True,
+                          format_func=lambda m: "Revenue" if m == "amount" else "Commission")
+    
+    if is_admin:
+        col1, col2, col3 = st.columns(3)
+        for col, dimension, title in ((col1, 'rep', "Top Reps"),
+                                      (col2, 'product', "Top Products"),
+                                      (col3, 'customer', "Top Customers")):
+            with col:
+                st.write(f"**{title}**")
+                top = store.top(dimension, 5, period, metric)
+                if top:
+                    top_df = pd.DataFrame(top, columns=['Name', 'Total ($)'])
+                    top_df.index = range(1, len(top_df) + 1)
+                    st.dataframe(top_df, use_container_width=True)
+                else:
+                    st.info("No sales in this period")
+    else:
+        ranking = store.rank('rep', user['username'], period, metric)
+        if ranking:
+            rank, score, size = ranking
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("🏅 Your Rank", f"#{rank} of {size}")
+            with col2:
+                st.metric("Your Total", f"${score:,.2f}")
+        else:
+            st.info("No sales in this period")
@@ -0,0 +1,578 @@
+"""Database access helpers shared by every page (no heavy imports here)"""
+import streamlit as st
+import sqlite3
+import os
+import time
+from datetime import date
+from backend.leaderboard import LeaderboardStore
+from backend.timeseries import bucket_expression
+from backend.partitions import SalePartitions
+from backend.write_queue import WriteQueue, QueueFullError
+from backend.snapshot import ReportingSnapshot
+from backend.reaper import (
+    INSERT_LIVE_USER_SALE, SalesReaper, VISIBLE_SALE_USER, ensure_schema, soft_delete_user
+)
+from backend.jobs import JobScheduler
+from backend.job_handlers import register_jobs, validate_params
+from backend.dimensions import (Dimension, SALE_DDL, COMMISSION_RULE_DDL,
+                                ensure_dimensions, migrate_to_dimensions)
+
+DB_PATH = 'instance/sales_incentive.db'
+
+# Read-only helpers are served from a copy of DB_PATH refreshed through the SQLite
+# backup API, so report reads never contend with sale writes on the primary.
+REPORT_SNAPSHOT = os.environ.get('REPORT_SNAPSHOT', '1') != '0'
+REPORT_MAX_STALENESS = float(os.environ.get('REPORT_MAX_STALENESS', 10))
+
+# Worker threads for background jobs (statements, exports, rebuilds); 0 = enqueue only
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+# Closed quarters are moved out of the hot sale table into instance/archive/
+partitions = SalePartitions(DB_PATH, granularity='quarter')
+
+def init_database():
+    """Initialize database with tables and sample data"""
+    try:
+        # Ensure instance directory exists
+        os.makedirs('instance', exist_ok=True)
+        
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        
+        # Create tables
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username VARCHAR(80) UNIQUE NOT NULL,
+                email VARCHAR(120) UNIQUE NOT NULL,
+                password_hash VARCHAR(128),
+                role VARCHAR(20) DEFAULT 'sales_rep',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Customers and products are stored once and referenced by integer id
+        ensure_dimensions(conn)
+        cursor.execute(SALE_DDL.format(table='sale'))
+        
+        # Date-window queries (trend chart) seek on these instead of scanning
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sale_date ON sale (sale_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sale_user_date ON sale (user_id, sale_date)')
+        
+        cursor.execute(COMMISSION_RULE_DDL.format(table='commission_rule'))
+        
+        # Databases created before the dimension tables still hold names in sale rows
+        ensure_schema(conn)
+        partitions.ensure_catalog(conn)
+        migrate_to_dimensions(conn, partitions)
+        
+        # Insert sample users if they don't exist
+        users = [
+            ('admin', 'admin@example.com', 'admin123', 'admin'),
+            ('salesrep', 'salesrep@example.com', 'sales123', 'sales_rep'),
+            ('demo', 'demo@example.com', 'demo123', 'sales_rep'),
+            ('manager', 'manager@example.com', 'manager123', 'admin')
+        ]
+        
+        for username, email, password, role in users:
+            cursor.execute('''
+                INSERT OR IGNORE INTO user (username, email, password_hash, role)
+                VALUES (?, ?, ?, ?)
+            ''', (username, email, password, role))
+        
+        # Insert sample sales data (only into an empty table; there is no natural key)
+        has_sales = (cursor.execute('SELECT 1 FROM sale LIMIT 1').fetchone()
+                     or partitions.archived_totals(conn)[0])
+        sales_data = [] if has_sales else [
+    (1, 'Nestle India', 'Cloud Analytics Suite', 5200.00, 520.00, '2024-01-15'),
+    (2, 'PepsiCo Beverages', 'ERP Subscription', 7600.00, 608.00, '2024-01-17'),
+    (3, 'Samsung Electronics', 'IoT Device Package', 11200.00, 1344.00, '2024-01-20'),
+    (3, 'ICICI Bank', 'Cybersecurity Service', 4500.00, 360.00, '2024-01-22'),
+    (4, 'Nike Sports India', 'E-Commerce Integration', 9800.00, 980.00, '2024-01-25'),
+    (1, 'Apple Inc.', 'Cloud Storage Solution', 12500.00, 1500.00, '2024-01-27'),
+    (2, 'Sony Pictures', 'AI Marketing Tool', 8800.00, 704.00, '2024-01-28'),
+    (4, 'Deloitte Consulting', 'Enterprise SaaS Platform', 15800.00, 1896.00, '2024-01-30')
+]
+
+        
+        customers, products = get_dimensions()
+        for user_id, customer, product, amount, commission, sale_date in sales_data:
+            cursor.execute('''
+                INSERT OR IGNORE INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, customers.id_for(customer, conn), products.id_for(product, conn),
+                  amount, commission, sale_date))
+        
+        # Insert commission rules
+        has_rules = cursor.execute('SELECT 1 FROM commission_rule LIMIT 1').fetchone()
+        commission_rules = [] if has_rules else [
+            ('Premium Package', 10.00, 0, None),
+            ('Standard Package', 8.00, 0, None),
+            ('Basic Package', 5.00, 0, None),
+            ('Enterprise Solution', 12.00, 10000, None)
+        ]
+        
+        for product, rate, min_amt, max_amt in commission_rules:
+            cursor.execute('''
+                INSERT OR IGNORE INTO commission_rule (product_id, commission_rate, min_amount, max_amount)
+                VALUES (?, ?, ?, ?)
+            ''', (products.id_for(product, conn), rate, min_amt, max_amt))
+        
+        conn.commit()
+        
+        # Also runs daily as a background job (DEFAULT_SCHEDULES), for long-lived processes
+        partitions.archive_closed_periods(conn)
+        
+        conn.close()
+        # Sample rows may have been added; rebuild rankings on next use
+        get_leaderboard_store().clear()
+        invalidate_reports()
+        return True
+        
+    except Exception as e:
+        st.error(f"Database initialization error: {e}")
+        return False
+
+_database_ready = False
+
+def ensure_database():
+    """Run init_database once per process instead of on every rerun"""
+    global _database_ready
+    if not _database_ready:
+        _database_ready = init_database()
+        if _database_ready:
+            get_reaper()  # resumes purges left unfinished by a restart
+            get_job_scheduler()
+    return _database_ready
+
+def get_db_connection():
+    """Get database connection"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        return conn
+    except Exception as e:
+        st.error(f"Database connection error: {e}")
+        return None
+
+@st.cache_resource
+def get_report_snapshot():
+    """Process-wide reporting snapshot, refreshed on a schedule"""
+    snapshot = ReportingSnapshot(DB_PATH, max_staleness=REPORT_MAX_STALENESS)
+    snapshot.start()
+    return snapshot
+
+def get_read_connection():
+    """
+    Get a read-only connection for reports (at most REPORT_MAX_STALENESS seconds
+    behind). A session that just wrote reads the primary until a snapshot taken
+    after its write is in place, so it always sees its own sales.
+    """
+    if not REPORT_SNAPSHOT:
+        return get_db_connection()
+    last_write = st.session_state.get('last_write_at')
+    try:
+        snapshot = get_report_snapshot()
+        if last_write is not None and not snapshot.covers(last_write):
+            return get_db_connection()
+        conn = snapshot.connect()
+        conn.row_factory = sqlite3.Row
+        return conn
+    except Exception as e:
+        st.error(f"Database connection error: {e}")
+        return None
+
+def note_session_write():
+    """Record that this session wrote, for read-your-writes in get_read_connection"""
+    st.session_state['last_write_at'] = time.monotonic()
+
+def invalidate_reports():
+    """Refresh the reporting snapshot in the background after an edit or purge"""
+    if REPORT_SNAPSHOT:
+        get_report_snapshot().invalidate()
+
+@st.cache_resource
+def get_write_queue():
+    """Process-wide group-commit queue; all sale inserts go through its writer thread"""
+    on_commit = get_report_snapshot().note_writes if REPORT_SNAPSHOT else None
+    return WriteQueue(DB_PATH, on_commit=on_commit)
+
+@st.cache_resource
+def get_reaper():
+    """Process-wide background purger for soft-deleted users"""
+    reaper = SalesReaper(DB_PATH, partitions, get_write_queue(),
+                         on_done=lambda user_id: invalidate_reports())
+    reaper.start()
+    return reaper
+
+def _rollups_rebuilt():
+    get_leaderboard_store().clear()
+    invalidate_reports()
+
+@st.cache_resource
+def get_job_scheduler():
+    """Process-wide background job scheduler and worker pool"""
+    scheduler = JobScheduler(DB_PATH, workers=JOB_WORKERS)
+    register_jobs(scheduler, partitions, on_rollups_rebuilt=_rollups_rebuilt)
+    if JOB_WORKERS:
+        scheduler.start()
+    return scheduler
+
+@st.cache_resource
+def get_dimensions():
+    """Process-wide (customer, product) name -> id caches"""
+    return Dimension('customer'), Dimension('product')
+
+@st.cache_resource
+def get_leaderboard_store():
+    """Process-wide leaderboard store shared across sessions and reruns"""
+    return LeaderboardStore()
+
+def get_leaderboards():
+    """Get the leaderboard store, loading it from the sale table on first use"""
+    store = get_leaderboard_store()
+    if store.loaded:
+        return store
+    
+    def fetch():
+        # Read from the primary: sales committed after a stale snapshot was
+        # taken would otherwise never reach the store
+        conn = get_db_connection()
+        if not conn:
+            return []
+        try:
+            return partitions.execute(conn, '''
+                SELECT s.id, u.username, p.name, c.name,
+                       s.amount, s.commission_amount, s.sale_date
+                FROM {sale} s
+                JOIN user u ON s.user_id = u.id
+                JOIN product p ON s.product_id = p.id
+                JOIN customer c ON s.customer_id = c.id
+                WHERE u.deleted_at IS NULL
+            ''')
+        finally:
+            conn.close()
+    
+    try:
+        # add_sale records under the same lock, so no sale is missed or counted twice
+        store.ensure_loaded(fetch)
+    except Exception as e:
+        st.error(f"Error loading leaderboards: {e}")
+    return store
+
+def authenticate_user(username, password):
+    """Authenticate user"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+        
+        user = conn.execute('''
+            SELECT * FROM user WHERE username = ? AND password_hash = ? AND deleted_at IS NULL
+        ''', (username, password)).fetchone()
+        
+        conn.close()
+        
+        if user:
+            return dict(user)
+        return None
+        
+    except Exception as e:
+        st.error(f"Authentication error: {e}")
+        return None
+
+def get_sales_stats(user_id=None):
+    """Get sales statistics"""
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return {}
+        
+        if user_id:
+            stats = conn.execute(f'''
+                SELECT 
+                    COUNT(*) as total_sales,
+                    COALESCE(SUM(amount), 0) as total_amount,
+                    COALESCE(SUM(commission_amount), 0) as total_commission,
+                    COALESCE(AVG(amount), 0) as average_sale
+                FROM sale WHERE user_id = ? AND {VISIBLE_SALE_USER}
+            ''', (user_id,)).fetchone()
+        else:
+            stats = conn.execute(f'''
+                SELECT 
+                    COUNT(*) as total_sales,
+                    COALESCE(SUM(amount), 0) as total_amount,
+                    COALESCE(SUM(commission_amount), 0) as total_commission,
+                    COALESCE(AVG(amount), 0) as average_sale
+                FROM sale WHERE {VISIBLE_SALE_USER}
+            ''').fetchone()
+        
+        # Closed periods contribute their precomputed totals
+        archived_sales, archived_amount, archived_commission, _, _ = \
+            partitions.archived_totals(conn, user_id, VISIBLE_SALE_USER)
+        conn.close()
+        
+        if not stats:
+            return {}
+        stats = dict(stats)
+        stats['total_sales'] += archived_sales
+        stats['total_amount'] += archived_amount
+        stats['total_commission'] += archived_commission
+        if stats['total_sales']:
+            stats['average_sale'] = stats['total_amount'] / stats['total_sales']
+        return stats
+    except Exception as e:
+        st.error(f"Error fetching statistics: {e}")
+        return {}
+
+def get_sale_date_range(user_id=None):
+    """Get (first, last) sale dates as ISO strings, or (None, None) without sales"""
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return None, None
+        
+        if user_id:
+            bounds = conn.execute('''
+                SELECT MIN(sale_date), MAX(sale_date) FROM sale WHERE user_id = ?
+            ''', (user_id,)).fetchone()
+        else:
+            bounds = conn.execute(f'''
+                SELECT MIN(sale_date), MAX(sale_date) FROM sale WHERE {VISIBLE_SALE_USER}
+            ''').fetchone()
+        archived_first, archived_last = partitions.archived_totals(conn, user_id, VISIBLE_SALE_USER)[3:]
+        
+        conn.close()
+        firsts = [d for d in (bounds[0], archived_first) if d]
+        lasts = [d for d in (bounds[1], archived_last) if d]
+        return (min(firsts) if firsts else None), (max(lasts) if lasts else None)
+    except Exception as e:
+        st.error(f"Error fetching sale dates: {e}")
+        return None, None
+
+def get_sales_trend(start, end, bucket, user_id=None):
+    """Get (bucket_start, amount) totals for sales between start and end inclusive"""
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return []
+        
+        period = bucket_expression(bucket)
+        user_filter = 'AND user_id = ?' if user_id else ''
+        params = (start.isoformat(), end.isoformat()) + ((user_id,) if user_id else ())
+        rows = partitions.execute(conn, f'''
+            SELECT {period} AS period, SUM(amount) AS amount
+            FROM {{sale}}
+            WHERE sale_date BETWEEN ? AND ? {user_filter} AND {VISIBLE_SALE_USER}
+            GROUP BY period
+        ''', params, start, end)
+        
+        conn.close()
+        # A bucket can straddle two partitions (e.g. a week across quarters)
+        totals = {}
+        for row in rows:
+            totals[row['period']] = totals.get(row['period'], 0) + row['amount']
+        return sorted(totals.items())
+    except Exception as e:
+        st.error(f"Error fetching sales trend: {e}")
+        return []
+
+def add_commission_rule(product_name, commission_rate, min_amount, max_amount):
+    """Add or update commission rule"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        
+        # Rules are matched to products by id; one rule per product
+        product_id = get_dimensions()[1].id_for(product_name, conn)
+        conn.execute('''
+            INSERT INTO commission_rule (product_id, commission_rate, min_amount, max_amount)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (product_id) DO UPDATE SET
+                commission_rate = excluded.commission_rate,
+                min_amount = excluded.min_amount,
+                max_amount = excluded.max_amount
+        ''', (product_id, commission_rate, min_amount, max_amount))
+        
+        conn.commit()
+        conn.close()
+        note_session_write()
+        invalidate_reports()
+        return True
+        
+    except Exception as e:
+        st.error(f"Error adding commission rule: {e}")
+        return False
+
+def get_all_users():
+    """Get all users"""
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return []
+        
+        users = conn.execute('''
+            SELECT * FROM user WHERE deleted_at IS NULL ORDER BY username
+        ''').fetchall()
+        
+        conn.close()
+        return [dict(user) for user in users]
+    except Exception as e:
+        st.error(f"Error fetching users: {e}")
+        return []
+
+def add_user(username, email, password, role):
+    """Add new user"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        
+        conn.execute('''
+            INSERT INTO user (username, email, password_hash, role)
+            VALUES (?, ?, ?, ?)
+        ''', (username, email, password, role))
+        
+        conn.commit()
+        conn.close()
+        note_session_write()
+        invalidate_reports()
+        return True
+        
+    except Exception as e:
+        st.error(f"Error adding user: {e}")
+        return False
+
+def update_user(user_id, username, email, role):
+    """Update user information"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        
+        conn.execute('''
+            UPDATE user SET username = ?, email = ?, role = ?
+            WHERE id = ?
+        ''', (username, email, role, user_id))
+        
+        conn.commit()
+        conn.close()
+        # Reps are ranked by username
+        get_leaderboard_store().clear()
+        note_session_write()
+        invalidate_reports()
+        return True
+        
+    except Exception as e:
+        st.error(f"Error updating user: {e}")
+        return False
+
+def delete_user(user_id):
+    """Delete user: hidden immediately, sales removed in the background"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        
+        # Flag only; the reaper deletes the sales (hot and archived) in small chunks
+        soft_delete_user(conn, user_id, partitions)
+        conn.close()
+        get_reaper().enqueue(user_id)
+        
+        get_leaderboard_store().clear()
+        note_session_write()
+        invalidate_reports()
+        return True
+        
+    except Exception as e:
+        st.error(f"Error deleting user: {e}")
+        return False
+
+def get_purge_progress():
+    """Get purges of deleted users that are still running"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return []
+        
+        rows = get_reaper().progress(conn)
+        conn.close()
+        return [dict(zip(('user_id', 'total_sales', 'removed_sales', 'status', 'error'), row))
+                for row in rows]
+    except Exception as e:
+        st.error(f"Error fetching deletion progress: {e}")
+        return []
+
+def add_sale(user_id, customer_name, product_name, amount, commission_rate):
+    """Add new sale record"""
+    try:
+        commission_amount = amount * (commission_rate / 100)
+        
+        conn = get_db_connection()
+        if not conn:
+            return False
+        
+        # Known names are resolved from memory; new ones are created through the queue
+        write_queue = get_write_queue()
+        customers, products = get_dimensions()
+        customer_id = customers.id_for(customer_name, conn, write_queue.execute)
+        product_id = products.id_for(product_name, conn, write_queue.execute)
+        
+        # Batched with other reps' sales into one commit; returns once durable.
+        # A session left open by a deleted user can't add sales the purge would miss.
+        sale_date = date.today()
+        result = write_queue.execute(INSERT_LIVE_USER_SALE, (
+            user_id, customer_id, product_id, amount, commission_amount, sale_date.isoformat(), user_id
+        ))
+        if not result.rowcount:
+            conn.close()
+            st.error("This account has been deleted")
+            return False
+        note_session_write()
+        
+        rep = conn.execute('SELECT username FROM user WHERE id = ?', (user_id,)).fetchone()
+        conn.close()
+        
+        # Skipped if the store isn't loaded yet or its load already counted this sale
+        if rep:
+            get_leaderboard_store().record_sale(
+                rep['username'], products.name_of(product_id), customers.name_of(customer_id),
+                amount, commission_amount, sale_date, sale_id=result.lastrowid
+            )
+        return True
+        
+    except QueueFullError:
+        st.error("⏳ Too many sales are being saved right now, please try again")
+        return False
+    except Exception as e:
+        st.error(f"Error adding sale: {e}")
+        return False
+
+def enqueue_job(kind, params=None, priority=0):
+    """Queue a background job; returns its id or None"""
+    try:
+        return get_job_scheduler().enqueue(kind, validate_params(kind, params or {}), priority)
+    except Exception as e:
+        st.error(f"Error queueing job: {e}")
+        return None
+
+def get_jobs(limit=20):
+    """Get the most recent background jobs"""
+    try:
+        return get_job_scheduler().jobs(limit)
+    except Exception as e:
+        st.error(f"Error fetching jobs: {e}")
+        return []
+
+def cancel_job(job_id):
+    """Cancel a queued or running background job"""
+    try:
+        return get_job_scheduler().cancel(job_id)
+    except Exception as e:
+        st.error(f"Error cancelling job: {e}")
+        return False
+
+def get_job_file(job_id, filename):
+    """Path of a file produced by a finished job, or None"""
+    return get_job_scheduler().output_file(job_id, filename)
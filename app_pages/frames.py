@@ -0,0 +1,212 @@
+"""Typed pandas DataFrames built straight from query cursors (imported only by pages that use pandas)"""
+import streamlit as st
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from app_pages.data import get_dimensions, get_read_connection, partitions
+from backend.simulator import SalesHistory, simulate
+
+BATCH_SIZE = 10000
+
+# The what-if simulator reuses the loaded history for this long
+HISTORY_TTL = 300
+
+# Dimension kinds: fetched as integer ids, decoded to names once per frame
+DIMENSION_KINDS = ('customer', 'product')
+
+# Column name -> (SQL expression, dtype kind) for sale queries; also the whitelist
+SALE_COLUMNS = {
+    'id': ('s.id', 'int'),
+    'user_id': ('s.user_id', 'int'),
+    'salesperson': ('u.username', 'category'),
+    'customer_id': ('s.customer_id', 'int'),
+    'product_id': ('s.product_id', 'int'),
+    'customer_name': ('s.customer_id', 'customer'),
+    'product_name': ('s.product_id', 'product'),
+    'amount': ('s.amount', 'float'),
+    'commission_amount': ('s.commission_amount', 'float'),
+    'sale_date': ('s.sale_date', 'date'),
+}
+
+RULE_COLUMNS = {
+    'id': ('r.id', 'int'),
+    'product_id': ('r.product_id', 'int'),
+    'product_name': ('p.name', 'category'),
+    'commission_rate': ('r.commission_rate', 'float'),
+    'min_amount': ('r.min_amount', 'float'),
+    'max_amount': ('r.max_amount', 'float'),
+}
+
+def _convert(values, kind):
+    """Convert one batch of column values (a tuple) to a typed array"""
+    if kind == 'float':
+        return np.array(values, dtype='float64')
+    if kind == 'int' or kind in DIMENSION_KINDS:
+        return np.array(values, dtype='int64')
+    if kind == 'date':
+        return np.array(values, dtype='datetime64[D]')
+    if kind == 'category':
+        return pd.Categorical(values)
+    return np.array(values, dtype=object)
+
+def _combine(batches, kind):
+    if kind == 'category':
+        return union_categoricals(batches) if batches else pd.Categorical([])
+    empty = {'float': 'float64', 'int': 'int64', 'date': 'datetime64[D]',
+             'customer': 'int64', 'product': 'int64'}.get(kind, object)
+    column = np.concatenate(batches) if batches else np.array([], dtype=empty)
+    return column.astype('datetime64[ns]') if kind == 'date' else column
+
+def frame_from_cursors(cursors, columns, kinds, batch_size=BATCH_SIZE):
+    """
+    Build a DataFrame column by column from cursors yielding tuples in `columns`
+    order. Rows are fetched batch_size at a time and each batch is converted to
+    typed arrays straight away, so no per-row dict (or full row list) is kept.
+    """
+    batches = {name: [] for name in columns}
+    for cursor in cursors:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for name, kind, values in zip(columns, kinds, zip(*rows)):
+                batches[name].append(_convert(values, kind))
+    return pd.DataFrame({
+        name: _combine(batches[name], kind) for name, kind in zip(columns, kinds)
+    })
+
+def decode_dimension(conn, table, ids):
+    """
+    Categorical of names for an array of customer/product ids. Only the distinct
+    ids are looked up (through the process-wide Dimension cache), so rows never
+    carry (or compare) the name strings.
+    """
+    used, codes = np.unique(ids, return_inverse=True)
+    used = used.tolist()
+    dimension = dict(zip(DIMENSION_KINDS, get_dimensions()))[table]
+    names = dimension.names_for(used, conn)
+    return pd.Categorical.from_codes(codes, categories=[names[i] for i in used])
+
+def get_sales_frame(columns, user_id=None, start=None, end=None):
+    """Get the given sale columns as a typed DataFrame, newest first"""
+    try:
+        unknown = set(columns) - set(SALE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown sale columns: {', '.join(sorted(unknown))}")
+
+        conn = get_read_connection()
+        if not conn:
+            return pd.DataFrame(columns=columns)
+        conn.row_factory = None
+
+        conditions, params = ['u.deleted_at IS NULL'], []
+        if user_id:
+            conditions.append('s.user_id = ?')
+            params.append(user_id)
+        if start:
+            conditions.append('s.sale_date >= ?')
+            params.append(start.isoformat())
+        if end:
+            conditions.append('s.sale_date <= ?')
+            params.append(end.isoformat())
+
+        select = ', '.join(SALE_COLUMNS[name][0] for name in columns)
+        cursors = partitions.cursors(conn, f'''
+            SELECT {select}
+            FROM {{sale}} s
+            JOIN user u ON s.user_id = u.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY s.sale_date DESC
+        ''', params, start, end)
+        df = frame_from_cursors(cursors, columns, [SALE_COLUMNS[name][1] for name in columns])
+        for name in columns:
+            kind = SALE_COLUMNS[name][1]
+            if kind in DIMENSION_KINDS:
+                df[name] = decode_dimension(conn, kind, df[name].to_numpy())
+
+        conn.close()
+        return df
+    except Exception as e:
+        st.error(f"Error fetching sales data: {e}")
+        return pd.DataFrame(columns=columns)
+
+def get_commission_rules_frame(columns):
+    """Get the given commission rule columns as a typed DataFrame"""
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return pd.DataFrame(columns=columns)
+        conn.row_factory = None
+
+        select = ', '.join(RULE_COLUMNS[name][0] for name in columns)
+        cursor = conn.execute(f'''
+            SELECT {select}
+            FROM commission_rule r
+            JOIN product p ON r.product_id = p.id
+            ORDER BY p.name
+        ''')
+        df = frame_from_cursors([cursor], columns, [RULE_COLUMNS[name][1] for name in columns])
+
+        conn.close()
+        return df
+    except Exception as e:
+        st.error(f"Error fetching commission rules: {e}")
+        return pd.DataFrame(columns=columns)
+
+def get_product_ids():
+    """Product name -> id for every known product"""
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return {}
+        products = {row[1]: row[0] for row in conn.execute('SELECT id, name FROM product ORDER BY name')}
+        conn.close()
+        return products
+    except Exception as e:
+        st.error(f"Error fetching products: {e}")
+        return {}
+
+@st.cache_resource(ttl=HISTORY_TTL)
+def get_sales_history():
+    """Every visible sale (hot and archived) as column arrays for the what-if simulator"""
+    df = get_sales_frame(['salesperson', 'product_id', 'amount', 'commission_amount'])
+    if df.empty:
+        return SalesHistory([], [], [], [], [])
+    reps = df['salesperson'].cat
+    return SalesHistory(reps.categories, reps.codes, df['product_id'].to_numpy(),
+                        df['amount'].to_numpy(), df['commission_amount'].to_numpy())
+
+def run_scenarios(scenarios):
+    """
+    Evaluate {scenario name: [rules]} against the full sale history, where each
+    rule is a dict of product_name, commission_rate, min_amount and max_amount.
+    Returns (summary, by_rep, by_product) DataFrames of payout deltas; nothing
+    is written to the database.
+    """
+    product_ids = get_product_ids()
+    product_names = {product_id: name for name, product_id in product_ids.items()}
+    history = get_sales_history()
+    results = simulate(history, {
+        name: [dict(rule, product_id=product_ids[rule['product_name']])
+               for rule in rules if rule['product_name'] in product_ids]
+        for name, rules in scenarios.items()
+    })
+
+    summary = pd.DataFrame([{
+        'Scenario': result.name,
+        'Sales Re-priced': result.repriced_sales,
+        'Current Payout ($)': result.current_total,
+        'Simulated Payout ($)': result.simulated_total,
+        'Change ($)': result.simulated_total - result.current_total,
+    } for result in results])
+
+    by_rep = pd.DataFrame({'Current Payout ($)': history.by_rep_current},
+                          index=pd.Index(history.reps, name='Salesperson'))
+    by_product = pd.DataFrame({'Current Payout ($)': history.by_product_current})
+    for result in results:
+        by_rep[f'{result.name} ($)'] = result.by_rep_delta
+        by_product[f'{result.name} ($)'] = result.by_product_delta
+    # Product ids without sales or rules are gaps in the id range
+    by_product = by_product[by_product.index.isin(product_names.keys()) & by_product.any(axis=1)]
+    by_product.index = pd.Index([product_names[i] for i in by_product.index], name='Product')
+    return summary, by_rep.reset_index(), by_product.reset_index()
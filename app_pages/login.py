@@ -0,0 +1,53 @@
+import streamlit as st
+from app_pages.data import ensure_database, authenticate_user
+
+def login_page():
+    """Login page"""
+    st.title("🔐 Sales Incentive Calculator")
+    st.markdown("---")
+    
+    # Initialize database
+    if ensure_database():
+        st.success("✅ Database initialized successfully")
+    
+    st.subheader("Please Login to Continue")
+    
+    # Login instructions
+    with st.expander("ℹ️ Available Demo Accounts", expanded=True):
+        st.info("""
+        **👨‍💼 Admin Accounts:**
+        - Username: `admin` / Password: `admin123` (System Administrator)
+        - Username: `manager` / Password: `manager123` (Sales Manager)
+        
+        **👤 Sales Rep Accounts:**
+        - Username: `salesrep` / Password: `sales123` (Sales Representative)
+        - Username: `demo` / Password: `demo123` (Demo Sales Rep)
+        
+        **Features:**
+        - 📊 Sales Dashboard with charts and statistics
+        - 💼 Sales Management (add, view, edit sales)
+        - ⚙️ Commission Rules Management (admin only)
+        - 👥 User Management (admin only)
+        """)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        with st.form("login_form"):
+            username = st.text_input("👤 Username", value="admin")
+            password = st.text_input("🔒 Password", type="password", value="admin123")
+            
+            submit = st.form_submit_button("🚀 Login", use_container_width=True)
+            
+            if submit:
+                if username and password:
+                    user = authenticate_user(username, password)
+                    if user:
+                        st.session_state.logged_in = True
+                        st.session_state.user = user
+                        st.success(f"✅ Welcome {user['username']}! ({user['role']})")
+                        st.rerun()
+                    else:
+                        st.error("❌ Invalid credentials")
+                else:
+                    st.error("Please enter both username and password")
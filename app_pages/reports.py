@@ -0,0 +1,99 @@
+import os
+import streamlit as st
+from datetime import date, timedelta
+from backend.job_handlers import JOB_KINDS, MONTHLY_STATEMENTS, SALES_EXPORT, REBUILD_ROLLUPS
+from app_pages.data import enqueue_job, get_jobs, cancel_job, get_job_file, get_all_users
+
+STATUS_ICONS = {'queued': '⏳', 'running': '⚙️', 'done': '✅', 'failed': '❌', 'cancelled': '🚫'}
+
+# Larger result files are only read into memory once the user asks for them
+INLINE_DOWNLOAD_BYTES = 1024 * 1024
+
+def download_file(job_id, filename, path):
+    """Download button for a job's file; big files need a click first so reruns don't read them"""
+    key = f"download_{job_id}_{filename}"
+    size = os.path.getsize(path)
+    if size > INLINE_DOWNLOAD_BYTES and not st.session_state.get(f"prepared_{key}"):
+        if st.button(f"📦 Prepare {filename} ({size / 1024 / 1024:.1f} MB)", key=f"prepare_{key}"):
+            st.session_state[f"prepared_{key}"] = True
+            st.rerun()
+        return
+    with open(path, 'rb') as f:
+        st.download_button(f"⬇️ {filename}", f.read(), file_name=filename, mime="text/csv", key=key)
+
+def reports_page():
+    """Background reports page"""
+    st.title("📄 Reports")
+    st.info("Reports are generated in the background; you can leave this page and come back for the files.")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.subheader("🧾 Payout Statements")
+        with st.form("statements_form"):
+            last_month = date.today().replace(day=1) - timedelta(days=1)
+            months = []
+            for _ in range(12):
+                months.append(last_month.strftime('%Y-%m'))
+                last_month = last_month.replace(day=1) - timedelta(days=1)
+            month = st.selectbox("Month", months)
+            reps = {"All salespeople": None}
+            reps.update({user['username']: user['id'] for user in get_all_users()})
+            rep = st.selectbox("Salesperson", list(reps))
+
+            if st.form_submit_button("🧾 Generate Statements", use_container_width=True):
+                if enqueue_job(MONTHLY_STATEMENTS, {'month': month, 'user_id': reps[rep]}, priority=5):
+                    st.success("✅ Statements queued")
+
+    with col2:
+        st.subheader("📤 Sales Export")
+        with st.form("export_form"):
+            start = st.date_input("From", value=date.today() - timedelta(days=365))
+            end = st.date_input("To", value=date.today())
+
+            if st.form_submit_button("📤 Export CSV", use_container_width=True):
+                if start > end:
+                    st.error("The start date must be before the end date")
+                elif enqueue_job(SALES_EXPORT, {'start': start.isoformat(), 'end': end.isoformat()}):
+                    st.success("✅ Export queued")
+
+    with col3:
+        st.subheader("🔁 Rollups")
+        st.write("Recompute archived totals and reload the leaderboards. Also runs every Sunday.")
+        if st.button("🔁 Rebuild Rollups", use_container_width=True):
+            if enqueue_job(REBUILD_ROLLUPS, priority=-5):
+                st.success("✅ Rebuild queued")
+
+    st.markdown("---")
+
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.subheader("🗂️ Recent Jobs")
+    with col2:
+        if st.button("🔄 Refresh", use_container_width=True):
+            st.rerun()
+
+    jobs = get_jobs()
+    if not jobs:
+        st.info("No jobs yet")
+        return
+
+    for job in jobs:
+        title = f"{STATUS_ICONS.get(job['status'], '')} #{job['id']} {JOB_KINDS.get(job['kind'], job['kind'])}"
+        with st.expander(f"{title} — {job['status']}", expanded=job['status'] in ('queued', 'running')):
+            st.write(f"**Queued:** {job['created_at']} UTC"
+                     + (f" (schedule: {job['schedule']})" if job['schedule'] else ""))
+            if job['status'] in ('queued', 'running'):
+                st.progress(job['progress'], text=job['message'] or job['status'].title())
+                if st.button("🚫 Cancel", key=f"cancel_job_{job['id']}"):
+                    cancel_job(job['id'])
+                    st.rerun()
+            if job['error']:
+                attempts = f" (attempt {job['attempts']} of {job['max_attempts']})"
+                st.warning(f"{job['error']}{attempts}")
+            if job['status'] == 'done':
+                st.write(f"**Finished:** {job['finished_at']} UTC")
+                for filename in (job['result'] or {}).get('files', []):
+                    path = get_job_file(job['id'], filename)
+                    if path:
+                        download_file(job['id'], filename, path)
@@ -0,0 +1,48 @@
+import streamlit as st
+from app_pages.data import add_sale
+from app_pages.frames import get_sales_frame
+
+def sales_management_page():
+    """Sales management page"""
+    st.title("💼 Sales Management")
+    
+    user = st.session_state.user
+    
+    # Add new sale form
+    st.subheader("➕ Add New Sale")
+    
+    with st.form("add_sale_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            customer_name = st.text_input("Customer Name")
+            product_name = st.selectbox("Product", 
+                ["Premium Package", "Standard Package", "Basic Package", "Enterprise Solution"])
+        
+        with col2:
+            amount = st.number_input("Sale Amount ($)", min_value=0.01, value=1000.00, step=100.00)
+            commission_rate = st.number_input("Commission Rate (%)", min_value=0.1, max_value=50.0, value=10.0, step=0.5)
+        
+        submit = st.form_submit_button("💾 Add Sale", use_container_width=True)
+        
+        if submit:
+            if customer_name and product_name and amount > 0:
+                if add_sale(user['id'], customer_name, product_name, amount, commission_rate):
+                    st.success(f"✅ Sale added successfully! Commission: ${amount * (commission_rate/100):.2f}")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to add sale")
+            else:
+                st.error("Please fill in all required fields")
+    
+    st.markdown("---")
+    
+    # Display user's sales
+    st.subheader("📊 Your Sales History")
+    df = get_sales_frame(['customer_name', 'product_name', 'amount', 'commission_amount', 'sale_date'],
+                         user['id'])
+    
+    if not df.empty:
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        st.info("No sales records found")
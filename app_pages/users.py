@@ -0,0 +1,81 @@
+import streamlit as st
+from app_pages.data import add_user, delete_user, get_all_users, get_sales_stats, get_purge_progress
+
+def user_management_page():
+    """User management page"""
+    st.title("👥 User Management")
+    
+    # Add new user form
+    st.subheader("➕ Add New User")
+    
+    with st.form("add_user_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            new_username = st.text_input("Username")
+            new_email = st.text_input("Email")
+        
+        with col2:
+            new_password = st.text_input("Password", type="password")
+            new_role = st.selectbox("Role", ["sales_rep", "admin"])
+        
+        submit = st.form_submit_button("👤 Add User", use_container_width=True)
+        
+        if submit:
+            if new_username and new_email and new_password:
+                if add_user(new_username, new_email, new_password, new_role):
+                    st.success(f"✅ User {new_username} added successfully!")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to add user (username/email might already exist)")
+            else:
+                st.error("Please fill in all fields")
+    
+    st.markdown("---")
+    
+    # Display existing users
+    st.subheader("📋 Current Users")
+    users = get_all_users()
+    
+    if users:
+        for user in users:
+            with st.expander(f"👤 {user['username']} ({user['role']})"):
+                col1, col2, col3 = st.columns([2, 2, 1])
+                
+                with col1:
+                    st.write(f"**Email:** {user['email']}")
+                    st.write(f"**Role:** {user['role']}")
+                    st.write(f"**Created:** {user['created_at']}")
+                
+                with col2:
+                    # Get user's sales stats
+                    user_stats = get_sales_stats(user['id'])
+                    st.metric("Sales Count", user_stats.get('total_sales', 0))
+                    st.metric("Total Revenue", f"${user_stats.get('total_amount', 0):,.0f}")
+                
+                with col3:
+                    if st.button(f"🗑️ Delete", key=f"delete_{user['id']}", 
+                               help="Hide user now; their sales are removed in the background"):
+                        if user['id'] != st.session_state.user['id']:  # Can't delete self
+                            if delete_user(user['id']):
+                                st.success(f"User {user['username']} deleted")
+                                st.rerun()
+                        else:
+                            st.error("Cannot delete your own account")
+    else:
+        st.info("No users found")
+    
+    # Sales of deleted users are removed in the background
+    purges = get_purge_progress()
+    if purges:
+        st.markdown("---")
+        st.subheader("🧹 Cleaning Up Deleted Users")
+        for purge in purges:
+            total = purge['total_sales'] or 1
+            label = f"User #{purge['user_id']}: {purge['removed_sales']:,} of {purge['total_sales']:,} sales removed"
+            if purge['status'] == 'failed':
+                st.error(f"{label} (failed: {purge['error']})")
+            else:
+                st.progress(min(purge['removed_sales'] / total, 1.0), text=label)
+        if st.button("🔄 Refresh progress"):
+            st.rerun()
@@ -35,7 +35,7 @@ def authenticate_user(username, password):
     Authenticate user and return access token
     Returns dict: {'access_token': ..., 'user': {...}} or None
     """
-    user = User.query.filter_by(username=username).first()
+    user = User.query.filter_by(username=username, deleted_at=None).first()
     if user and user.check_password(password):
         access_token = create_access_token(identity=user.id)
         return {
@@ -11,11 +11,28 @@ def init_db(app):
     
     with app.app_context():
         # Import models to ensure they're registered
-        from backend.models import User, Sale, CommissionRule
+        from backend.models import User, Sale, CommissionRule, Customer, Product
+        from backend.dimensions import migrate_to_dimensions
+        from backend.partitions import SalePartitions
+        from backend.reaper import ensure_schema
+        
+        # Older databases store customer/product names in every sale row
+        conn = db.engine.raw_connection()
+        try:
+            migrate_to_dimensions(conn, SalePartitions(db.engine.url.database))
+        finally:
+            conn.close()
         
         # Create all tables
         db.create_all()
         
+        # create_all doesn't alter existing tables: add user.deleted_at to older databases
+        conn = db.engine.raw_connection()
+        try:
+            ensure_schema(conn)
+        finally:
+            conn.close()
+        
         # Create default admin user if not exists
         admin = User.query.filter_by(username='admin').first()
         if not admin:
@@ -0,0 +1,271 @@
+import os
+import threading
+
+from backend.partitions import ARCHIVE_SCHEMA
+
+# Ids per IN (...) lookup, well under SQLite's bound-variable limit
+LOOKUP_CHUNK = 500
+
+# Names are compared case-insensitively, so 'ACME Corp' and 'Acme Corp' share a key
+DIMENSION_DDL = {
+    'customer': '''
+        CREATE TABLE IF NOT EXISTS customer (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL UNIQUE COLLATE NOCASE
+        )
+    ''',
+    'product': '''
+        CREATE TABLE IF NOT EXISTS product (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL UNIQUE COLLATE NOCASE
+        )
+    ''',
+}
+
+SALE_DDL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        customer_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        amount DECIMAL(10,2) NOT NULL,
+        commission_amount DECIMAL(10,2) NOT NULL,
+        sale_date DATE NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES user (id),
+        FOREIGN KEY (customer_id) REFERENCES customer (id),
+        FOREIGN KEY (product_id) REFERENCES product (id)
+    )
+'''
+
+COMMISSION_RULE_DDL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL UNIQUE,
+        commission_rate DECIMAL(5,2) NOT NULL,
+        min_amount DECIMAL(10,2) DEFAULT 0,
+        max_amount DECIMAL(10,2),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (product_id) REFERENCES product (id)
+    )
+'''
+
+# Free-text columns of the old schema -> the id columns replacing them
+NAME_COLUMNS = {'customer_name': 'customer_id', 'product_name': 'product_id'}
+
+
+def ensure_dimensions(conn):
+    """Create the customer and product tables"""
+    for ddl in DIMENSION_DDL.values():
+        conn.execute(ddl)
+
+
+def migrate_to_dimensions(conn, partitions):
+    """
+    Move sale and commission_rule from free-text names to customer/product ids.
+
+    Existing names are deduplicated (trimmed, case-insensitive) into the
+    dimension tables, then each table is rebuilt with integer keys: the hot
+    sale table, commission_rule and every archived partition. Tables already
+    on the new schema are left alone, so this is safe to run on every start.
+    """
+    ensure_dimensions(conn)
+    cursor = conn.cursor()
+
+    if _has_column(cursor, 'main', 'sale', 'customer_name'):
+        _rebuild_sale(cursor, 'main')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sale_date ON sale (sale_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sale_user_date ON sale (user_id, sale_date)')
+
+    if _has_column(cursor, 'main', 'commission_rule', 'product_name'):
+        _intern(cursor, 'product', 'main.commission_rule', 'product_name')
+        cursor.execute(COMMISSION_RULE_DDL.format(table='commission_rule_new'))
+        # Several rules for one product (only possible in the old schema): keep the newest
+        cursor.execute('''
+            INSERT INTO commission_rule_new
+                (id, product_id, commission_rate, min_amount, max_amount, created_at)
+            SELECT r.id, p.id, r.commission_rate, r.min_amount, r.max_amount, r.created_at
+            FROM commission_rule r JOIN product p ON p.name = TRIM(r.product_name)
+            WHERE r.id = (
+                SELECT MAX(r2.id) FROM commission_rule r2 WHERE TRIM(r2.product_name) = p.name
+            )
+        ''')
+        _swap(cursor, 'main', 'commission_rule')
+    conn.commit()
+
+    # Archives are only unsealed (and re-vacuumed) when they still need it
+    for name in _legacy_partitions(cursor, partitions):
+        with partitions._writable(conn, name) as archive:
+            _rebuild_sale(archive, ARCHIVE_SCHEMA)
+            archive.execute(
+                f'CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_sale_user_date ON sale (user_id, sale_date)'
+            )
+
+
+def _legacy_partitions(cursor, partitions):
+    if not partitions.has_catalog(cursor):
+        return []
+    legacy = []
+    for name, filename in cursor.execute('SELECT name, filename FROM sale_partition ORDER BY name').fetchall():
+        cursor.execute(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (os.path.join(partitions.archive_dir, filename),))
+        try:
+            if _has_column(cursor, ARCHIVE_SCHEMA, 'sale', 'customer_name'):
+                legacy.append(name)
+        finally:
+            cursor.execute(f'DETACH DATABASE {ARCHIVE_SCHEMA}')
+    return legacy
+
+
+def _has_column(cursor, schema, table, column):
+    return column in [row[1] for row in _columns(cursor, schema, table)]
+
+
+def _intern(cursor, dimension, table, column):
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO main.{dimension} (name)
+        SELECT TRIM({column}) FROM {table} GROUP BY TRIM({column}) ORDER BY MIN(rowid)
+    ''')
+
+
+def _rebuild_sale(cursor, schema):
+    """Rebuild {schema}.sale with customer_id/product_id (SQLite can't alter column types)"""
+    table = f'{schema}.sale'
+    _intern(cursor, 'customer', table, 'customer_name')
+    _intern(cursor, 'product', table, 'product_name')
+    # Names are committed on their own: with WAL a transaction writing the main
+    # database and an attached archive isn't atomic, and the rebuilt archive
+    # must never reference ids that didn't get committed
+    cursor.connection.commit()
+    columns = _columns(cursor, schema, 'sale')
+    cursor.execute(_rebuilt_sale_ddl(columns, f'{schema}.sale_new'))
+    names = [NAME_COLUMNS.get(column[1], column[1]) for column in columns]
+    joined = {'customer_name': 'c.id', 'product_name': 'p.id'}
+    values = [joined.get(column[1], f's.{column[1]}') for column in columns]
+    cursor.execute(f'''
+        INSERT INTO {schema}.sale_new ({', '.join(names)})
+        SELECT {', '.join(values)}
+        FROM {table} s
+        JOIN main.customer c ON c.name = TRIM(s.customer_name)
+        JOIN main.product p ON p.name = TRIM(s.product_name)
+    ''')
+    _swap(cursor, schema, 'sale')
+
+
+def _columns(cursor, schema, table):
+    """PRAGMA table_info rows: (cid, name, type, notnull, default, pk)"""
+    return cursor.execute(f'PRAGMA {schema}.table_info({table})').fetchall()
+
+
+def _rebuilt_sale_ddl(columns, table):
+    """
+    SALE_DDL for whatever columns the old table has: the name columns become
+    id columns and every other column keeps its type, nullability and default.
+    The Flask model's sale table has extra columns (commission_rate) and a
+    nullable commission_amount, and both must survive the rebuild.
+    """
+    definitions = []
+    for _, name, type_, notnull, default, pk in columns:
+        if name in NAME_COLUMNS:
+            definitions.append(f'{NAME_COLUMNS[name]} INTEGER NOT NULL')
+        elif pk:
+            definitions.append(f'{name} INTEGER PRIMARY KEY AUTOINCREMENT')
+        else:
+            definitions.append(f'{name} {type_}'
+                               + (' NOT NULL' if notnull else '')
+                               + (f' DEFAULT {default}' if default is not None else ''))
+    definitions += [
+        'FOREIGN KEY (user_id) REFERENCES user (id)',
+        'FOREIGN KEY (customer_id) REFERENCES customer (id)',
+        'FOREIGN KEY (product_id) REFERENCES product (id)',
+    ]
+    return f'CREATE TABLE IF NOT EXISTS {table} (\n    ' + ',\n    '.join(definitions) + '\n)'
+
+
+def _swap(cursor, schema, table):
+    """Replace table with table_new, keeping the AUTOINCREMENT high-water mark"""
+    sequence = cursor.execute(
+        f'SELECT seq FROM {schema}.sqlite_sequence WHERE name = ?', (table,)
+    ).fetchone()
+    cursor.execute(f'DROP TABLE {schema}.{table}')
+    cursor.execute(f'ALTER TABLE {schema}.{table}_new RENAME TO {table}')
+    if sequence:
+        # Archived rows keep their ids, so ids must not be reused even if the table is now empty
+        cursor.execute(f'DELETE FROM {schema}.sqlite_sequence WHERE name = ?', (table,))
+        cursor.execute(f'INSERT INTO {schema}.sqlite_sequence (name, seq) VALUES (?, ?)', (table, sequence[0]))
+
+
+class Dimension:
+    """
+    Get-or-create lookup of names to integer keys for one dimension table.
+
+    Ids never change once assigned, so they are cached in memory for the life of
+    the process and the write path only touches the table for names it has not
+    seen yet.
+    """
+
+    def __init__(self, table):
+        if table not in DIMENSION_DDL:
+            raise ValueError(f"Unknown dimension: {table}")
+        self.table = table
+        self._ids = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def id_for(self, name, conn, write=None):
+        """
+        Id for name, creating the row when it's new. conn is used for lookups;
+        write(sql, params), if given, performs the insert (e.g. WriteQueue.execute),
+        otherwise it is run on conn and committed.
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError(f"{self.table} name is required")
+        with self._lock:
+            cached = self._ids.get(name)
+        if cached is not None:
+            return cached
+
+        select = f'SELECT id, name FROM {self.table} WHERE name = ?'
+        row = conn.execute(select, (name,)).fetchone()
+        if row is None:
+            insert = f'INSERT OR IGNORE INTO {self.table} (name) VALUES (?)'
+            if write:
+                write(insert, (name,))
+            else:
+                conn.execute(insert, (name,))
+                conn.commit()
+            row = conn.execute(select, (name,)).fetchone()
+
+        with self._lock:
+            self._ids[name] = row[0]
+            self._names[row[0]] = row[1]
+        return row[0]
+
+    def name_of(self, id):
+        """Stored spelling of a name already resolved by id_for (None otherwise)"""
+        with self._lock:
+            return self._names.get(id)
+
+    def names_for(self, ids, conn):
+        """
+        {id: stored name} for ids. Ids not cached yet are read from conn with
+        WHERE id IN (...), LOOKUP_CHUNK at a time, and cached like id_for's.
+        """
+        with self._lock:
+            missing = [id for id in set(ids) if id not in self._names]
+        for start in range(0, len(missing), LOOKUP_CHUNK):
+            chunk = missing[start:start + LOOKUP_CHUNK]
+            rows = conn.execute(
+                f'SELECT id, name FROM {self.table} WHERE id IN ({", ".join("?" * len(chunk))})', chunk
+            ).fetchall()
+            with self._lock:
+                for id, name in rows:
+                    self._names[id] = name
+                    self._ids.setdefault(name, id)
+        with self._lock:
+            return {id: self._names.get(id) for id in ids}
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
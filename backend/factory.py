@@ -19,10 +19,15 @@ def create_app(config_name='default'):
     from backend.routes.user_routes import user_bp
     from backend.routes.sales_routes import sales_bp
     from backend.routes.commission_routes import commission_bp
+    from backend.routes.job_routes import jobs_bp, init_jobs
     
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(sales_bp, url_prefix='/api/sales')
     app.register_blueprint(commission_bp, url_prefix='/api/commission')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    
+    # Statements, exports and rebuilds run on background workers, not request threads
+    init_jobs(app)
     
     # Health check endpoint
     @app.route('/api/health')
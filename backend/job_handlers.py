@@ -0,0 +1,221 @@
+import csv
+import inspect
+import sqlite3
+from datetime import date, timedelta
+
+MONTHLY_STATEMENTS = 'monthly_statements'
+SALES_EXPORT = 'sales_export'
+REBUILD_ROLLUPS = 'rebuild_rollups'
+ARCHIVE_PERIODS = 'archive_periods'
+
+JOB_KINDS = {
+    MONTHLY_STATEMENTS: 'Monthly payout statements',
+    SALES_EXPORT: 'Sales CSV export',
+    REBUILD_ROLLUPS: 'Rollup & leaderboard rebuild',
+    ARCHIVE_PERIODS: 'Archive closed periods',
+}
+
+# name -> (kind, cron, params, priority); cron times are UTC
+DEFAULT_SCHEDULES = {
+    'monthly-statements': (MONTHLY_STATEMENTS, '0 2 1 * *', {}, 5),
+    'weekly-rollups': (REBUILD_ROLLUPS, '30 3 * * 0', {}, 0),
+    # Daily, so a quarter leaves the hot table soon after its grace period ends
+    'daily-archival': (ARCHIVE_PERIODS, '15 1 * * *', {}, 0),
+}
+
+EXPORT_BATCH_SIZE = 5000
+
+SALE_ROWS = '''
+    SELECT s.id, u.username, s.sale_date, c.name, p.name, s.amount, s.commission_amount
+    FROM {{sale}} s
+    JOIN user u ON s.user_id = u.id
+    JOIN customer c ON s.customer_id = c.id
+    JOIN product p ON s.product_id = p.id
+    WHERE u.deleted_at IS NULL {conditions}
+'''
+
+SALE_HEADER = ['Sale ID', 'Salesperson', 'Date', 'Customer', 'Product', 'Amount', 'Commission']
+
+
+def register_jobs(scheduler, partitions, on_rollups_rebuilt=None, schedules=True):
+    """
+    Register the statement, export, rollup and archival handlers on a JobScheduler
+    (and the default schedules). on_rollups_rebuilt is called after a rebuild so the
+    process can reload in-memory state such as its leaderboards.
+    """
+    scheduler.register(MONTHLY_STATEMENTS, lambda ctx, **params: monthly_statements(ctx, partitions, **params))
+    scheduler.register(SALES_EXPORT, lambda ctx, **params: sales_export(ctx, partitions, **params))
+    scheduler.register(REBUILD_ROLLUPS, lambda ctx, **params: rebuild_rollups(
+        ctx, partitions, on_done=on_rollups_rebuilt, **params))
+    scheduler.register(ARCHIVE_PERIODS, lambda ctx, **params: archive_periods(ctx, partitions, **params))
+    if schedules:
+        for name, (kind, cron, params, priority) in DEFAULT_SCHEDULES.items():
+            scheduler.add_schedule(name, kind, cron, params, priority)
+
+
+# ------------------------------
+# Parameters
+# ------------------------------
+def _month_param(value):
+    return f"{date.fromisoformat(f'{value}-01'):%Y-%m}"
+
+
+def _date_param(value):
+    return date.fromisoformat(value).isoformat()
+
+
+def _id_param(value):
+    if isinstance(value, bool) or int(value) != value or value < 1:
+        raise ValueError(value)
+    return int(value)
+
+
+# Parameter name -> check returning the normalised value (raises on bad input)
+PARAM_CHECKS = {
+    'month': (_month_param, 'a YYYY-MM month'),
+    'start': (_date_param, 'a YYYY-MM-DD date'),
+    'end': (_date_param, 'a YYYY-MM-DD date'),
+    'user_id': (_id_param, 'a user id'),
+}
+
+
+def validate_params(kind, params):
+    """
+    Check a job's params against its handler's keyword arguments before it is
+    queued, so bad input is rejected up front instead of failing every retry.
+    Returns the normalised params; raises ValueError with a readable message.
+    """
+    accepted = [name for name in inspect.signature(JOB_HANDLERS[kind]).parameters
+                if name not in ('ctx', 'partitions', 'on_done')]
+    unknown = sorted(set(params) - set(accepted))
+    if unknown:
+        expected = ', '.join(accepted) or 'none'
+        raise ValueError(f"Unknown params for {kind}: {', '.join(unknown)} (expected: {expected})")
+    cleaned = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        check, description = PARAM_CHECKS[name]
+        try:
+            cleaned[name] = check(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be {description}") from None
+    return cleaned
+
+
+def _month_bounds(month):
+    """(first, last) day of a 'YYYY-MM' month; defaults to the previous month"""
+    if month:
+        first = date.fromisoformat(f'{month}-01')
+    else:
+        first = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def monthly_statements(ctx, partitions, month=None, user_id=None):
+    """One CSV payout statement per rep for a month (default: last month)"""
+    first, last = _month_bounds(month)
+    conditions, params = 'AND s.sale_date BETWEEN ? AND ?', [first.isoformat(), last.isoformat()]
+    if user_id:
+        conditions += ' AND s.user_id = ?'
+        params.append(user_id)
+
+    conn = sqlite3.connect(ctx.db_path, timeout=30)
+    try:
+        statements = {}
+        for cursor in partitions.cursors(conn, SALE_ROWS.format(conditions=conditions), params, first, last):
+            for row in cursor:
+                statements.setdefault(row[1], []).append(row)
+    finally:
+        conn.close()
+
+    files = []
+    for done, (username, rows) in enumerate(sorted(statements.items())):
+        rows.sort(key=lambda row: (row[2], row[0]))
+        filename = f'statement_{first:%Y-%m}_{username}.csv'
+        with open(ctx.output_path(filename), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(SALE_HEADER)
+            writer.writerows(rows)
+            writer.writerow(['Total', username, f'{first:%Y-%m}', '', '',
+                             sum(row[5] for row in rows), sum(row[6] for row in rows)])
+        files.append(filename)
+        ctx.progress(done + 1, len(statements), f'{username}: {len(rows)} sales')
+
+    return {'month': f'{first:%Y-%m}', 'reps': len(files), 'files': files}
+
+
+def sales_export(ctx, partitions, start=None, end=None, user_id=None):
+    """All sales between start and end (ISO dates, inclusive) as one CSV, newest partition first"""
+    conditions, params = '', []
+    if start:
+        conditions += ' AND s.sale_date >= ?'
+        params.append(start)
+    if end:
+        conditions += ' AND s.sale_date <= ?'
+        params.append(end)
+    if user_id:
+        conditions += ' AND s.user_id = ?'
+        params.append(user_id)
+
+    filename = f'sales_{start or "start"}_{end or "today"}.csv'
+    conn = sqlite3.connect(ctx.db_path, timeout=30)
+    try:
+        total = 1 + len(partitions.partitions_for(conn.cursor(), start, end))
+        rows = 0
+        with open(ctx.output_path(filename), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(SALE_HEADER)
+            sql = SALE_ROWS.format(conditions=conditions) + ' ORDER BY s.sale_date DESC'
+            for done, cursor in enumerate(partitions.cursors(conn, sql, params, start, end)):
+                while True:
+                    batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                    if not batch:
+                        break
+                    writer.writerows(batch)
+                    rows += len(batch)
+                    ctx.progress(done, total, f'{rows:,} sales written')
+                ctx.progress(done + 1, total, f'{rows:,} sales written')
+    finally:
+        conn.close()
+
+    return {'rows': rows, 'files': [filename]}
+
+
+def rebuild_rollups(ctx, partitions, on_done=None):
+    """Recompute every archive's catalog totals and per-rep rollups, then reload leaderboards"""
+    conn = sqlite3.connect(ctx.db_path, timeout=30)
+    try:
+        names = partitions.names(conn)
+        for done, name in enumerate(names):
+            partitions.refresh_partition(conn, name)
+            ctx.progress(done + 1, len(names) + 1, f'{name} refreshed')
+    finally:
+        conn.close()
+
+    if on_done:
+        on_done()
+    return {'partitions': len(names)}
+
+
+def archive_periods(ctx, partitions):
+    """Move every period closed since the last run out of the hot sale table"""
+    def archived_one(names):
+        # Keeps the lease alive: the number of periods left isn't known up front
+        ctx.progress(len(names), len(names) + 1, f'{names[-1]} archived')
+
+    conn = sqlite3.connect(ctx.db_path, timeout=30)
+    try:
+        archived = partitions.archive_closed_periods(conn, on_archived=archived_one)
+    finally:
+        conn.close()
+    return {'partitions': archived}
+
+
+JOB_HANDLERS = {
+    MONTHLY_STATEMENTS: monthly_statements,
+    SALES_EXPORT: sales_export,
+    REBUILD_ROLLUPS: rebuild_rollups,
+    ARCHIVE_PERIODS: archive_periods,
+}
@@ -0,0 +1,509 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+JOB_DDL = (
+    '''
+    CREATE TABLE IF NOT EXISTS job (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind VARCHAR(50) NOT NULL,
+        params TEXT NOT NULL DEFAULT '{}',
+        priority INTEGER NOT NULL DEFAULT 0,
+        status VARCHAR(20) NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT,
+        result TEXT,
+        error TEXT,
+        schedule VARCHAR(50),
+        worker VARCHAR(50),
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        run_after DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME,
+        heartbeat_at DATETIME,
+        finished_at DATETIME
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_job_queue ON job (status, priority, run_after)',
+    '''
+    CREATE TABLE IF NOT EXISTS job_schedule (
+        name VARCHAR(50) PRIMARY KEY,
+        kind VARCHAR(50) NOT NULL,
+        params TEXT NOT NULL DEFAULT '{}',
+        cron VARCHAR(50) NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        enabled INTEGER NOT NULL DEFAULT 1,
+        next_run DATETIME NOT NULL,
+        last_job_id INTEGER
+    )
+    ''',
+)
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+JOB_COLUMNS = ('id', 'kind', 'params', 'priority', 'status', 'attempts', 'max_attempts',
+               'progress', 'message', 'result', 'error', 'schedule', 'run_after',
+               'created_at', 'started_at', 'finished_at')
+
+# Same text format as SQLite's CURRENT_TIMESTAMP (UTC), so values compare as strings
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# A run owns its job row through (worker, attempt): once a lease expires and the
+# job is claimed again, updates from the old run match nothing
+CLAIMED = "id = ? AND status = 'running' AND worker = ? AND attempts = ?"
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _timestamp(moment):
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler (from JobContext.progress) once its job is cancelled"""
+
+
+# ------------------------------
+# Cron expressions
+# ------------------------------
+CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+}
+
+# (low, high) for minute, hour, day of month, month, day of week (0 and 7 = Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class CronSchedule:
+    """
+    Standard five-field cron expression (minute hour day month weekday) with
+    *, lists, ranges and steps, plus the @hourly/@daily/@weekly/@monthly/@yearly
+    aliases. As in cron, when both day of month and day of week are restricted
+    a day matching either one qualifies. Times are UTC.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for part in field.split(','):
+            part, _, step = part.partition('/')
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = end = int(part)
+                if step:
+                    end = high
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron field out of range: {field!r}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment):
+        """First matching minute strictly after moment"""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                month = moment.month % 12 + 1
+                moment = moment.replace(year=moment.year + (month == 1), month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+# ------------------------------
+# Handler context
+# ------------------------------
+class JobContext:
+    """Passed to handlers: progress reporting, cancellation and an output directory"""
+
+    def __init__(self, scheduler, job_id, attempt):
+        self.scheduler = scheduler
+        self.job_id = job_id
+        self.attempt = attempt
+        self.db_path = scheduler.db_path
+        self.output_dir = os.path.join(scheduler.output_dir, f'job_{job_id}')
+        self._reported_at = 0
+
+    def output_path(self, filename):
+        """Path for a result file; list the names in the handler's result under 'files'"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, filename)
+
+    def progress(self, done, total=None, message=None):
+        """
+        Report progress (done/total, or a fraction when total is None). Writes are
+        throttled to one per progress_interval; raises JobCancelled if the job
+        was cancelled meanwhile.
+        """
+        fraction = min(1.0, done / total if total else done)
+        now = time.monotonic()
+        if fraction < 1 and now - self._reported_at < self.scheduler.progress_interval:
+            return
+        self._reported_at = now
+        if self.scheduler._report(self.job_id, self.attempt, fraction, message):
+            raise JobCancelled(f'Job {self.job_id} was cancelled')
+
+
+# ------------------------------
+# Scheduler
+# ------------------------------
+class JobScheduler:
+    """
+    Background jobs backed by the job table of a SQLite database.
+
+    enqueue() records a job and returns its id; status() and jobs() poll it. Any
+    process using the same database can enqueue and poll, and every process
+    that calls start() runs a pool of worker threads that claim queued jobs
+    (highest priority first, then oldest) in a BEGIN IMMEDIATE transaction, so
+    a job runs exactly once even with several processes. A worker only claims
+    kinds it has a handler for.
+
+    Handlers are called as handler(ctx, **params) with a JobContext and return
+    a JSON-serialisable result. A handler that raises is retried with
+    exponential backoff (retry_delay * 2 ** (attempt - 1)) until max_attempts is
+    reached. A running job that stops reporting progress for lease seconds
+    (e.g. its process died) is queued again; should the old run still be
+    alive, its next progress report stops it and its outcome is discarded.
+
+    Schedules (add_schedule) enqueue a job whenever their cron expression comes
+    due; the scheduler thread checks them every poll_interval seconds.
+    """
+
+    def __init__(self, db_path, output_dir=None, workers=2, poll_interval=1.0,
+                 retry_delay=30, lease=600, progress_interval=0.5):
+        self.db_path = db_path
+        self.output_dir = output_dir or os.path.join(os.path.dirname(db_path) or '.', 'reports')
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self.progress_interval = progress_interval
+        self.worker_id = f'{os.getpid()}-{uuid.uuid4().hex[:6]}'
+        self._handlers = {}
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._schema_ready = False
+
+    def register(self, kind, handler):
+        """Handle jobs of this kind in this process"""
+        self._handlers[kind] = handler
+
+    # ------------------------------
+    # Jobs
+    # ------------------------------
+    def enqueue(self, kind, params=None, priority=0, delay=0, max_attempts=3, schedule=None):
+        """Queue a job and return its id; higher priority runs first"""
+        conn = self._connect()
+        try:
+            job_id = self._insert_job(conn, kind, params or {}, priority, _now() + timedelta(seconds=delay),
+                                      max_attempts, schedule)
+        finally:
+            conn.close()
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        """The job as a dict (params and result decoded), or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(f'SELECT {", ".join(JOB_COLUMNS)} FROM job WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._job_dict(row) if row else None
+
+    def jobs(self, limit=20, status=None, kind=None):
+        """Most recent jobs first, optionally filtered by status and kind"""
+        conditions, params = ['1 = 1'], []
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if kind:
+            conditions.append('kind = ?')
+            params.append(kind)
+        conn = self._connect()
+        try:
+            rows = conn.execute(f'''
+                SELECT {", ".join(JOB_COLUMNS)} FROM job
+                WHERE {' AND '.join(conditions)}
+                ORDER BY id DESC LIMIT ?
+            ''', params + [limit]).fetchall()
+        finally:
+            conn.close()
+        return [self._job_dict(row) for row in rows]
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running one to stop; False if already finished"""
+        conn = self._connect()
+        try:
+            cancelled = conn.execute('''
+                UPDATE job SET status = 'cancelled', finished_at = ?
+                WHERE id = ? AND status = 'queued'
+            ''', (_timestamp(_now()), job_id)).rowcount
+            if not cancelled:
+                cancelled = conn.execute('''
+                    UPDATE job SET cancel_requested = 1 WHERE id = ? AND status = 'running'
+                ''', (job_id,)).rowcount
+        finally:
+            conn.close()
+        return bool(cancelled)
+
+    def output_file(self, job_id, filename):
+        """Path of a result file of a finished job, or None"""
+        path = os.path.join(self.output_dir, f'job_{int(job_id)}', os.path.basename(filename))
+        return path if os.path.isfile(path) else None
+
+    # ------------------------------
+    # Schedules
+    # ------------------------------
+    def add_schedule(self, name, kind, cron, params=None, priority=0):
+        """Create or update a named cron schedule; its next run is kept unless cron changes"""
+        next_run = _timestamp(CronSchedule(cron).next_after(_now()))
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO job_schedule (name, kind, params, cron, priority, next_run)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    kind = excluded.kind, params = excluded.params, priority = excluded.priority,
+                    cron = excluded.cron, enabled = 1,
+                    next_run = CASE WHEN cron = excluded.cron THEN next_run ELSE excluded.next_run END
+            ''', (name, kind, json.dumps(params or {}), cron, priority, next_run))
+        finally:
+            conn.close()
+
+    def remove_schedule(self, name):
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM job_schedule WHERE name = ?', (name,))
+        finally:
+            conn.close()
+
+    def schedules(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT name, kind, params, cron, priority, enabled, next_run, last_job_id
+                FROM job_schedule ORDER BY name
+            ''').fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(('name', 'kind', 'params', 'cron', 'priority', 'enabled', 'next_run', 'last_job_id'),
+                         row[:2] + (json.loads(row[2]),) + row[3:])) for row in rows]
+
+    # ------------------------------
+    # Threads
+    # ------------------------------
+    def start(self):
+        """Start the worker pool and the schedule thread (once)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._connect().close()  # create the tables before the threads race for them
+            self._threads.append(threading.Thread(target=self._schedule_loop, name='job-scheduler', daemon=True))
+            for number in range(self.workers):
+                self._threads.append(threading.Thread(target=self._work_loop, name=f'job-worker-{number + 1}',
+                                                      daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def _schedule_loop(self):
+        while True:
+            try:
+                self._enqueue_due()
+                self._expire_leases()
+            except sqlite3.Error:
+                pass  # database busy; try again next round
+            time.sleep(self.poll_interval)
+
+    def _work_loop(self):
+        while True:
+            try:
+                job = self._claim()
+            except sqlite3.Error:
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(*job)
+
+    def _run(self, job_id, kind, params, attempt, max_attempts):
+        ctx = JobContext(self, job_id, attempt)
+        try:
+            result = self._handlers[kind](ctx, **params)
+        except JobCancelled:
+            self._finish(job_id, attempt, 'cancelled')
+        except Exception as e:
+            if attempt < max_attempts:
+                self._retry(job_id, attempt, e)
+            else:
+                self._finish(job_id, attempt, 'failed', error=f'{type(e).__name__}: {e}')
+        else:
+            self._finish(job_id, attempt, 'done', result=result)
+
+    # ------------------------------
+    # Storage
+    # ------------------------------
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._schema_ready:
+            for ddl in JOB_DDL:
+                conn.execute(ddl)
+            self._schema_ready = True
+        return conn
+
+    def _insert_job(self, conn, kind, params, priority, run_after, max_attempts, schedule):
+        return conn.execute('''
+            INSERT INTO job (kind, params, priority, max_attempts, run_after, schedule)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (kind, json.dumps(params), priority, max_attempts, _timestamp(run_after), schedule)).lastrowid
+
+    def _claim(self):
+        """Mark the next runnable job as ours; returns (id, kind, params, attempt, max_attempts)"""
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+        now = _timestamp(_now())
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(f'''
+                SELECT id, kind, params, attempts, max_attempts FROM job
+                WHERE status = 'queued' AND run_after <= ? AND kind IN ({', '.join('?' * len(kinds))})
+                ORDER BY priority DESC, run_after, id LIMIT 1
+            ''', [now] + kinds).fetchone()
+            if row:
+                conn.execute('''
+                    UPDATE job SET status = 'running', attempts = attempts + 1, worker = ?,
+                        started_at = ?, heartbeat_at = ?, progress = 0, message = NULL
+                    WHERE id = ?
+                ''', (self.worker_id, now, now, row[0]))
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]), row[3] + 1, row[4]
+
+    def _report(self, job_id, attempt, fraction, message):
+        """
+        Store progress and refresh the lease; returns True if cancellation was
+        requested or the job is no longer ours (its lease expired)
+        """
+        conn = self._connect()
+        try:
+            updated = conn.execute(f'''
+                UPDATE job SET progress = ?, message = COALESCE(?, message), heartbeat_at = ?
+                WHERE {CLAIMED}
+            ''', (fraction, message, _timestamp(_now()), job_id, self.worker_id, attempt)).rowcount
+            if not updated:
+                return True
+            return bool(conn.execute('SELECT cancel_requested FROM job WHERE id = ?', (job_id,)).fetchone()[0])
+        finally:
+            conn.close()
+
+    def _finish(self, job_id, attempt, status, result=None, error=None):
+        conn = self._connect()
+        try:
+            conn.execute(f'''
+                UPDATE job SET status = ?, result = ?, error = ?, finished_at = ?,
+                    progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END
+                WHERE {CLAIMED}
+            ''', (status, json.dumps(result) if result is not None else None, error,
+                  _timestamp(_now()), status, job_id, self.worker_id, attempt))
+        finally:
+            conn.close()
+
+    def _retry(self, job_id, attempt, error):
+        run_after = _now() + timedelta(seconds=self.retry_delay * 2 ** (attempt - 1))
+        conn = self._connect()
+        try:
+            conn.execute(f'''
+                UPDATE job SET status = 'queued', run_after = ?, error = ?, worker = NULL
+                WHERE {CLAIMED}
+            ''', (_timestamp(run_after), f'{type(error).__name__}: {error}', job_id, self.worker_id, attempt))
+        finally:
+            conn.close()
+
+    def _enqueue_due(self):
+        """Queue a job for every schedule that has come due and move it to its next run"""
+        now = _now()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            due = conn.execute('''
+                SELECT name, kind, params, cron, priority FROM job_schedule
+                WHERE enabled = 1 AND next_run <= ?
+            ''', (_timestamp(now),)).fetchall()
+            for name, kind, params, cron, priority in due:
+                job_id = self._insert_job(conn, kind, json.loads(params), priority, now, 3, name)
+                conn.execute('UPDATE job_schedule SET next_run = ?, last_job_id = ? WHERE name = ?',
+                             (_timestamp(CronSchedule(cron).next_after(now)), job_id, name))
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        if due:
+            self._wakeup.set()
+
+    def _expire_leases(self):
+        """Requeue (or fail, when out of attempts) running jobs whose worker went quiet"""
+        expired = _timestamp(_now() - timedelta(seconds=self.lease))
+        conn = self._connect()
+        try:
+            conn.execute('''
+                UPDATE job SET
+                    status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                    error = 'Worker stopped responding', worker = NULL,
+                    finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END
+                WHERE status = 'running' AND heartbeat_at < ?
+            ''', (_timestamp(_now()), expired))
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job_dict(row):
+        job = dict(zip(JOB_COLUMNS, row))
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
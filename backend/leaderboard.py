@@ -0,0 +1,258 @@
+import random
+import threading
+
+ALL_TIME = 'all'
+DIMENSIONS = ('rep', 'product', 'customer')
+METRICS = ('amount', 'commission')
+
+
+def period_of(sale_date):
+    """Return the monthly period key ('YYYY-MM') for a date or ISO date string"""
+    return str(sale_date)[:7]
+
+
+# ------------------------------
+# Ranked set
+# ------------------------------
+class _Node:
+    __slots__ = ('key', 'member', 'forward', 'span')
+
+    def __init__(self, key, member, level):
+        self.key = key
+        self.member = member
+        self.forward = [None] * level
+        self.span = [0] * level
+
+
+class RankedSet:
+    """
+    Members ordered by descending score, backed by an indexable skip list.
+    Updates, rank lookups and top-N queries are all O(log n) (+ n for ranges).
+    Ties are broken by member so the ordering is stable.
+    """
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._scores = {}
+        self._head = _Node(None, None, self.MAX_LEVEL)
+        self._level = 1
+        self._random = random.Random()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, member):
+        return member in self._scores
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def add(self, member, delta):
+        """Add delta to a member's score (inserting it at 0 first if new)"""
+        score = self._scores.get(member)
+        if score is not None:
+            self._unlink((-score, member))
+        score = (score or 0) + delta
+        self._scores[member] = score
+        self._link((-score, member), member)
+        return score
+
+    def discard(self, member):
+        score = self._scores.pop(member, None)
+        if score is not None:
+            self._unlink((-score, member))
+
+    def rank(self, member):
+        """1-based rank of member, or None if it is not present"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        key = (-score, member)
+        rank = 0
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key <= key:
+                rank += node.span[i]
+                node = node.forward[i]
+            if node.key == key:
+                return rank
+        return None
+
+    def range(self, start=0, count=10):
+        """Return up to count (member, score) pairs starting at 0-based position start"""
+        if start < 0 or count <= 0 or start >= len(self._scores):
+            return []
+        node = self._node_at(start + 1)
+        result = []
+        while node is not None and len(result) < count:
+            result.append((node.member, -node.key[0]))
+            node = node.forward[0]
+        return result
+
+    def _node_at(self, rank):
+        traversed = 0
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and traversed + node.span[i] <= rank:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if traversed == rank:
+                return node
+        return None
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < self.P:
+            level += 1
+        return level
+
+    def _link(self, key, member):
+        update = [None] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while node.forward[i] is not None and node.forward[i].key < key:
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            # New levels start at the head and span the whole list
+            size = len(self._scores) - 1
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = size
+            self._level = level
+
+        new = _Node(key, member, level)
+        for i in range(level):
+            new.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new
+            new.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+
+    def _unlink(self, key):
+        update = [None] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                node = node.forward[i]
+            update[i] = node
+
+        target = node.forward[0]
+        if target is None or target.key != key:
+            return
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+
+
+# ------------------------------
+# Leaderboards
+# ------------------------------
+class LeaderboardStore:
+    """
+    Ranked totals per period ('YYYY-MM' and all-time), dimension (rep, product,
+    customer) and metric (amount, commission). Built once from the sale table
+    and then kept current by feeding it each sale as it is written.
+
+    sale_id is the highest sale id the last load() included. Sales get
+    increasing ids and a single writer commits them in order, so a sale with a
+    higher id was committed after the load's scan and is not in it yet.
+    """
+
+    def __init__(self):
+        self._boards = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.sale_id = 0
+
+    def load(self, rows, sale_id=0):
+        """
+        Rebuild from (rep, product, customer, amount, commission, sale_date) rows,
+        e.g. the result of a single scan of the sale table, whose highest id is sale_id
+        """
+        with self._lock:
+            self._boards = {}
+            self.record_sales(rows)
+            self.loaded = True
+            self.sale_id = sale_id
+
+    def ensure_loaded(self, fetch):
+        """
+        load() from fetch() unless already loaded. fetch returns (sale_id, rep,
+        product, customer, amount, commission, sale_date) rows; the lock is held
+        throughout, so a record_sale() racing the scan waits and then applies
+        its sale only if the scan missed it.
+        """
+        with self._lock:
+            if self.loaded:
+                return
+            rows = list(fetch())
+            self.load((row[1:] for row in rows), max((row[0] for row in rows), default=0))
+
+    def clear(self):
+        """Drop everything so the next load() starts from scratch"""
+        with self._lock:
+            self._boards = {}
+            self.loaded = False
+            self.sale_id = 0
+
+    def record_sale(self, rep, product, customer, amount, commission, sale_date, sale_id=None):
+        """
+        Apply one new sale to every affected leaderboard. With its sale_id, a sale
+        is skipped while nothing is loaded or when the last load already counted it.
+        """
+        members = {'rep': rep, 'product': product, 'customer': customer}
+        deltas = {'amount': float(amount or 0), 'commission': float(commission or 0)}
+        with self._lock:
+            if sale_id is not None and (not self.loaded or sale_id <= self.sale_id):
+                return
+            for period in (period_of(sale_date), ALL_TIME):
+                for dimension, member in members.items():
+                    for metric, delta in deltas.items():
+                        self._board(period, dimension, metric).add(member, delta)
+
+    def record_sales(self, rows):
+        """Apply a batch of (rep, product, customer, amount, commission, sale_date) rows"""
+        with self._lock:
+            for row in rows:
+                self.record_sale(*row)
+
+    def top(self, dimension, n=10, period=ALL_TIME, metric='amount'):
+        """Return the top n (member, score) pairs"""
+        with self._lock:
+            board = self._boards.get((period, dimension, metric))
+            return board.range(0, n) if board else []
+
+    def rank(self, dimension, member, period=ALL_TIME, metric='amount'):
+        """Return (rank, score, size) for a member, or None if it has no sales in the period"""
+        with self._lock:
+            board = self._boards.get((period, dimension, metric))
+            if not board or member not in board:
+                return None
+            return board.rank(member), board.score(member), len(board)
+
+    def periods(self):
+        """Monthly periods that have sales, newest first"""
+        with self._lock:
+            periods = {key[0] for key in self._boards if key[0] != ALL_TIME}
+        return sorted(periods, reverse=True)
+
+    def _board(self, period, dimension, metric):
+        key = (period, dimension, metric)
+        board = self._boards.get(key)
+        if board is None:
+            board = self._boards[key] = RankedSet()
+        return board
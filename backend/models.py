@@ -9,6 +9,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(128))
     role = db.Column(db.String(20), default='user')  # 'admin' or 'user'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime)  # soft delete; rows are purged by backend.reaper
     
     # Relationship with sales
     sales = db.relationship('Sale', backref='salesperson', lazy=True)
@@ -28,17 +29,29 @@ class User(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class Customer(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100, collation='NOCASE'), unique=True, nullable=False)
+
+class Product(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100, collation='NOCASE'), unique=True, nullable=False)
+
 class Sale(db.Model):
+    # Maps the hot table only; closed periods are archived by backend.partitions
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    customer_name = db.Column(db.String(100), nullable=False)
-    product_name = db.Column(db.String(100), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
     sale_date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date())
     commission_rate = db.Column(db.Float, default=0.05)
     commission_amount = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    customer = db.relationship('Customer', lazy='joined')
+    product = db.relationship('Product', lazy='joined')
+    
     def calculate_commission(self):
         """Calculate commission based on amount and rate"""
         self.commission_amount = self.amount * self.commission_rate
@@ -49,8 +62,8 @@ class Sale(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'salesperson': self.salesperson.username,
-            'customer_name': self.customer_name,
-            'product_name': self.product_name,
+            'customer_name': self.customer.name,
+            'product_name': self.product.name,
             'amount': self.amount,
             'sale_date': self.sale_date.isoformat(),
             'commission_rate': self.commission_rate,
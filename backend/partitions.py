@@ -0,0 +1,342 @@
+import os
+import sqlite3
+from datetime import date, timedelta
+
+GRANULARITIES = ('month', 'quarter')
+
+CATALOG_DDL = (
+    '''
+    CREATE TABLE IF NOT EXISTS sale_partition (
+        name VARCHAR(10) PRIMARY KEY,
+        filename VARCHAR(100) NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        row_count INTEGER NOT NULL DEFAULT 0,
+        total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+        total_commission DECIMAL(14,2) NOT NULL DEFAULT 0,
+        first_sale DATE,
+        last_sale DATE,
+        archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS sale_partition_rollup (
+        name VARCHAR(10) NOT NULL,
+        user_id INTEGER NOT NULL,
+        total_sales INTEGER NOT NULL,
+        total_amount DECIMAL(14,2) NOT NULL,
+        total_commission DECIMAL(14,2) NOT NULL,
+        first_sale DATE,
+        last_sale DATE,
+        PRIMARY KEY (name, user_id)
+    )
+    ''',
+)
+
+# Schema name used while a partition file is attached
+ARCHIVE_SCHEMA = 'archived'
+
+
+class SalePartitions:
+    """
+    Time-partitioned storage for the sale table.
+
+    The `sale` table in the main database only holds open periods. Once a month
+    or quarter is closed (its end is more than grace_days in the past) its rows
+    are moved into their own SQLite file under archive_dir, which is vacuumed
+    and made read-only. A catalog (sale_partition) records each file's date
+    range and totals, and sale_partition_rollup keeps per-user totals, so
+    all-time statistics never have to open the archives.
+
+    Reads go through execute(), which runs a query against the hot table and
+    only those archives whose range overlaps the requested dates.
+    """
+
+    def __init__(self, db_path, archive_dir=None, granularity='quarter', grace_days=7):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        self.db_path = db_path
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(db_path) or '.', 'archive')
+        self.granularity = granularity
+        self.grace_days = grace_days
+
+    # ------------------------------
+    # Periods
+    # ------------------------------
+    def period_bounds(self, day):
+        """Return (name, start, end) for the period containing day; end is exclusive"""
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        if self.granularity == 'month':
+            start = day.replace(day=1)
+            name = f'{day.year}m{day.month:02d}'
+        else:
+            quarter = (day.month - 1) // 3
+            start = date(day.year, quarter * 3 + 1, 1)
+            name = f'{day.year}q{quarter + 1}'
+        months = 1 if self.granularity == 'month' else 3
+        end_month = start.month + months
+        end = date(start.year + (end_month - 1) // 12, (end_month - 1) % 12 + 1, 1)
+        return name, start, end
+
+    def current_period_start(self, today=None):
+        """First day of the oldest period that is still open"""
+        cutoff = (today or date.today()) - timedelta(days=self.grace_days)
+        return self.period_bounds(cutoff)[1]
+
+    # ------------------------------
+    # Catalog
+    # ------------------------------
+    def ensure_catalog(self, conn):
+        cursor = conn.cursor()
+        for ddl in CATALOG_DDL:
+            cursor.execute(ddl)
+        conn.commit()
+
+    def has_catalog(self, cursor):
+        return cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sale_partition'"
+        ).fetchone() is not None
+
+    def partitions_for(self, cursor, start=None, end=None):
+        """Archive file paths overlapping [start, end], newest first"""
+        if not self.has_catalog(cursor):
+            return []
+        start = start.isoformat() if isinstance(start, date) else start
+        end = end.isoformat() if isinstance(end, date) else end
+        rows = cursor.execute('''
+            SELECT filename FROM sale_partition
+            WHERE (? IS NULL OR end_date > ?) AND (? IS NULL OR start_date <= ?)
+            ORDER BY start_date DESC
+        ''', (start, start, end, end)).fetchall()
+        return [os.path.join(self.archive_dir, row[0]) for row in rows]
+
+    def archived_totals(self, conn, user_id=None, user_filter=None):
+        """
+        (total_sales, total_amount, total_commission, first_sale, last_sale) over all
+        archived partitions, read from the catalog without opening any archive.
+        user_filter is an optional SQL condition on user_id (e.g. to hide users).
+        """
+        cursor = conn.cursor()
+        if not self.has_catalog(cursor):
+            return 0, 0, 0, None, None
+        conditions, params = ['1 = 1'], ()
+        if user_id:
+            conditions.append('user_id = ?')
+            params = (user_id,)
+        if user_filter:
+            conditions.append(user_filter)
+        where = 'WHERE ' + ' AND '.join(conditions)
+        row = cursor.execute(f'''
+            SELECT COALESCE(SUM(total_sales), 0), COALESCE(SUM(total_amount), 0),
+                   COALESCE(SUM(total_commission), 0), MIN(first_sale), MAX(last_sale)
+            FROM sale_partition_rollup {where}
+        ''', params).fetchone()
+        return tuple(row)
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+    def execute(self, conn, sql, params=(), start=None, end=None):
+        """
+        Run sql against the hot table and every archive overlapping [start, end]
+        (open-ended when None), returning all rows. Use {sale} in the query where
+        the sale table goes. Results come back newest partition first, so
+        per-partition ORDER BY sale_date DESC stays ordered overall.
+        """
+        rows = []
+        for cursor in self.cursors(conn, sql, params, start, end):
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def cursors(self, conn, sql, params=(), start=None, end=None):
+        """
+        Like execute(), but yields one executed cursor per partition so callers
+        can consume results in batches (fetchmany). Each archive stays attached
+        only until the caller moves on to the next cursor.
+        """
+        cursor = conn.cursor()
+        yield cursor.execute(sql.format(sale='main.sale'), params)
+        for path in self.partitions_for(conn.cursor(), start, end):
+            cursor = conn.cursor()
+            cursor.execute(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (path,))
+            try:
+                yield cursor.execute(sql.format(sale=f'{ARCHIVE_SCHEMA}.sale'), params)
+            finally:
+                cursor.close()
+                conn.execute(f'DETACH DATABASE {ARCHIVE_SCHEMA}')
+
+    # ------------------------------
+    # Archival
+    # ------------------------------
+    def archive_closed_periods(self, conn, today=None, on_archived=None):
+        """
+        Move every closed period out of the hot table; returns the partition names
+        written. on_archived(names so far) is called after each period.
+        """
+        self.ensure_catalog(conn)
+        boundary = self.current_period_start(today).isoformat()
+        cursor = conn.cursor()
+        archived = []
+        while True:
+            oldest = cursor.execute(
+                'SELECT MIN(sale_date) FROM main.sale WHERE sale_date < ?', (boundary,)
+            ).fetchone()[0]
+            if oldest is None:
+                return archived
+            name, start, end = self.period_bounds(oldest)
+            self._archive_period(conn, name, start, end)
+            archived.append(name)
+            if on_archived:
+                on_archived(archived)
+
+    def user_partitions(self, conn, user_id):
+        """Names of the archived partitions holding any of a user's sales"""
+        cursor = conn.cursor()
+        if not self.has_catalog(cursor):
+            return []
+        return [row[0] for row in cursor.execute(
+            'SELECT name FROM sale_partition_rollup WHERE user_id = ? ORDER BY name', (user_id,)
+        ).fetchall()]
+
+    def delete_partition_user_sales(self, conn, name, user_id):
+        """
+        Remove a user's sales from one archive and re-seal it. The main database
+        is only written for the short catalog refresh at the end.
+        """
+        with self._writable(conn, name) as cursor:
+            return cursor.execute(
+                f'DELETE FROM {ARCHIVE_SCHEMA}.sale WHERE user_id = ?', (user_id,)
+            ).rowcount
+
+    def names(self, conn):
+        """Names of all archived partitions, oldest first"""
+        cursor = conn.cursor()
+        if not self.has_catalog(cursor):
+            return []
+        return [row[0] for row in cursor.execute('SELECT name FROM sale_partition ORDER BY start_date')]
+
+    def refresh_partition(self, conn, name):
+        """Recompute one archive's catalog totals and per-user rollups from its file"""
+        with self._writable(conn, name):
+            pass
+
+    def delete_user_sales(self, conn, user_id):
+        """Remove a user's sales from every archive that holds any"""
+        return sum(self.delete_partition_user_sales(conn, name, user_id)
+                   for name in self.user_partitions(conn, user_id))
+
+    def _archive_period(self, conn, name, start, end):
+        """
+        Copy a period into its archive, then drop from the hot table only the rows
+        the archive holds. Each step commits one file, so after a crash in between
+        the rows are still hot and uncatalogued, and the next run finishes the job.
+        """
+        bounds = (start.isoformat(), end.isoformat())
+        ddl = conn.cursor().execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'sale'"
+        ).fetchone()[0]
+
+        def publish(cursor):
+            cursor.execute('''
+                INSERT OR IGNORE INTO sale_partition (name, filename, start_date, end_date)
+                VALUES (?, ?, ?, ?)
+            ''', (name, self._filename(name)) + bounds)
+            cursor.execute(f'''
+                DELETE FROM main.sale
+                WHERE sale_date >= ? AND sale_date < ? AND id IN (SELECT id FROM {ARCHIVE_SCHEMA}.sale)
+            ''', bounds)
+
+        with self._writable(conn, name, publish) as cursor:
+            # Same columns and constraints as the hot table
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.sale ' + ddl[ddl.index('('):])
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_sale_user_date ON sale (user_id, sale_date)'
+            )
+            # OR IGNORE: rows copied by an interrupted earlier run are already there
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.sale
+                SELECT * FROM main.sale WHERE sale_date >= ? AND sale_date < ?
+            ''', bounds)
+
+    def _writable(self, conn, name, publish=None):
+        return _WritablePartition(self, conn, name, publish)
+
+    def _filename(self, name):
+        return f'sale_{name}.db'
+
+    def _refresh_catalog(self, cursor, name):
+        """Recompute a partition's totals and per-user rollups from its attached file"""
+        cursor.execute(f'''
+            UPDATE sale_partition SET
+                (row_count, total_amount, total_commission, first_sale, last_sale, archived_at) = (
+                    SELECT COUNT(*), COALESCE(SUM(amount), 0), COALESCE(SUM(commission_amount), 0),
+                           MIN(sale_date), MAX(sale_date), CURRENT_TIMESTAMP
+                    FROM {ARCHIVE_SCHEMA}.sale
+                )
+            WHERE name = ?
+        ''', (name,))
+        cursor.execute('DELETE FROM sale_partition_rollup WHERE name = ?', (name,))
+        cursor.execute(f'''
+            INSERT INTO sale_partition_rollup
+            SELECT ?, user_id, COUNT(*), SUM(amount), SUM(commission_amount),
+                   MIN(sale_date), MAX(sale_date)
+            FROM {ARCHIVE_SCHEMA}.sale GROUP BY user_id
+        ''', (name,))
+
+    def _compact(self, path):
+        """VACUUM a partition file and mark it read-only"""
+        archive = sqlite3.connect(path)
+        try:
+            archive.execute('VACUUM')
+        finally:
+            archive.close()
+        os.chmod(path, 0o444)
+
+
+class _WritablePartition:
+    """
+    Context manager that unseals a partition file, attaches it read-write and
+    yields a cursor. On success the archive's changes are committed first, then
+    publish(cursor) (if given) and the catalog refresh are committed on the main
+    database; the file is then compacted and sealed again.
+
+    The main database runs in WAL mode, where SQLite doesn't commit a
+    transaction atomically across attached files, so every transaction here
+    writes a single file. Should the process die between the two commits, the
+    catalog is merely stale: it is recomputed from the file by the next
+    refresh_partition(), delete_partition_user_sales() or archival of the period.
+    """
+
+    def __init__(self, partitions, conn, name, publish=None):
+        self.partitions = partitions
+        self.conn = conn
+        self.name = name
+        self.publish = publish
+        self.path = os.path.join(partitions.archive_dir, partitions._filename(name))
+
+    def __enter__(self):
+        os.makedirs(self.partitions.archive_dir, exist_ok=True)
+        if os.path.exists(self.path):
+            os.chmod(self.path, 0o644)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (self.path,))
+        return self.cursor
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+                if self.publish:
+                    self.publish(self.cursor)
+                self.partitions._refresh_catalog(self.cursor, self.name)
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cursor.execute(f'DETACH DATABASE {ARCHIVE_SCHEMA}')
+        self.partitions._compact(self.path)
+        return False
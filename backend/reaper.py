@@ -0,0 +1,169 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PURGE_DDL = '''
+    CREATE TABLE IF NOT EXISTS user_purge (
+        user_id INTEGER PRIMARY KEY,
+        total_sales INTEGER NOT NULL DEFAULT 0,
+        removed_sales INTEGER NOT NULL DEFAULT 0,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        error TEXT,
+        requested_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        finished_at DATETIME
+    )
+'''
+
+# Condition on a sale's user_id that keeps only live users' sales: hides soft-deleted
+# users and, like the JOINs elsewhere, any sale left behind by a purged one
+VISIBLE_SALE_USER = 'user_id IN (SELECT id FROM user WHERE deleted_at IS NULL)'
+
+# Sale insert that only lands while the user is live. It runs in the writer's
+# transaction, so it is ordered against soft_delete_user: a sale either commits
+# before the flag (and is purged with the rest) or is rejected (rowcount 0).
+INSERT_LIVE_USER_SALE = '''
+    INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+    SELECT ?, ?, ?, ?, ?, ?
+    WHERE EXISTS (SELECT 1 FROM user WHERE id = ? AND deleted_at IS NULL)
+'''
+
+
+def ensure_schema(conn):
+    """Add the soft-delete flag to user and the purge progress table"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(user)').fetchall()]
+    if 'deleted_at' not in columns:
+        conn.execute('ALTER TABLE user ADD COLUMN deleted_at DATETIME')
+    conn.execute(PURGE_DDL)
+    conn.commit()
+
+
+def soft_delete_user(conn, user_id, partitions):
+    """
+    Flag a user as deleted (hiding them and their sales at once) and record a
+    pending purge. Cheap: nothing but the user row and one progress row is written.
+    """
+    hot_sales = conn.execute('SELECT COUNT(*) FROM sale WHERE user_id = ?', (user_id,)).fetchone()[0]
+    archived_sales = partitions.archived_totals(conn, user_id)[0]
+    conn.execute('UPDATE user SET deleted_at = CURRENT_TIMESTAMP WHERE id = ?', (user_id,))
+    conn.execute('''
+        INSERT OR REPLACE INTO user_purge (user_id, total_sales, removed_sales, status)
+        VALUES (?, ?, 0, 'pending')
+    ''', (user_id, hot_sales + archived_sales))
+    conn.commit()
+
+
+class SalesReaper:
+    """
+    Background purge of soft-deleted users.
+
+    Each user's hot sales are removed in chunk_size-row DELETEs submitted to the
+    WriteQueue, so they are group-committed alongside new sales and never hold
+    the write lock for long. Archived partitions are then cleaned one file at a
+    time (which also refreshes their rollups), and finally the user row itself
+    is removed. Progress is kept in user_purge; unfinished purges are picked
+    up again by start().
+    """
+
+    def __init__(self, db_path, partitions, write_queue, chunk_size=500, pause=0.01, on_done=None):
+        self.db_path = db_path
+        self.partitions = partitions
+        self.write_queue = write_queue
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.on_done = on_done
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the reaper thread and resume any unfinished purges"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                ensure_schema(conn)
+                for (user_id,) in conn.execute(
+                    "SELECT user_id FROM user_purge WHERE status != 'done' ORDER BY requested_at"
+                ).fetchall():
+                    self._queue.put(user_id)
+            finally:
+                conn.close()
+            self._thread = threading.Thread(target=self._run, name='sales-reaper', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, user_id):
+        """Schedule the purge of a user already flagged by soft_delete_user()"""
+        self._queue.put(user_id)
+
+    def progress(self, conn):
+        """List of user_purge rows (as tuples) that are not finished yet"""
+        return conn.execute('''
+            SELECT user_id, total_sales, removed_sales, status, error
+            FROM user_purge WHERE status != 'done' ORDER BY requested_at
+        ''').fetchall()
+
+    def _run(self):
+        while True:
+            user_id = self._queue.get()
+            try:
+                self._purge(user_id)
+            except Exception as e:
+                logger.exception('Purge of user %s failed', user_id)
+                self._fail(user_id, e)
+
+    def _fail(self, user_id, error):
+        """Record a failed purge; a failure to record it must not stop the thread"""
+        try:
+            self.write_queue.execute(
+                "UPDATE user_purge SET status = 'failed', error = ? WHERE user_id = ?",
+                (str(error), user_id)
+            )
+        except Exception:
+            logger.exception('Could not record failed purge of user %s', user_id)
+
+    def _purge(self, user_id):
+        self.write_queue.execute(
+            "UPDATE user_purge SET status = 'running', error = NULL WHERE user_id = ?", (user_id,)
+        )
+
+        # Hot table: small chunks interleaved with everyone else's writes
+        while True:
+            removed = self.write_queue.execute('''
+                DELETE FROM sale WHERE id IN (
+                    SELECT id FROM sale WHERE user_id = ? LIMIT ?
+                )
+            ''', (user_id, self.chunk_size)).rowcount
+            self._advance(user_id, removed)
+            if removed < self.chunk_size:
+                break
+            time.sleep(self.pause)
+
+        # Closed periods: one archive file per step
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            for name in self.partitions.user_partitions(conn, user_id):
+                self._advance(user_id, self.partitions.delete_partition_user_sales(conn, name, user_id))
+        finally:
+            conn.close()
+
+        self.write_queue.execute(
+            'DELETE FROM user WHERE id = ? AND deleted_at IS NOT NULL', (user_id,)
+        )
+        self.write_queue.execute('''
+            UPDATE user_purge SET status = 'done', finished_at = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+        ''', (user_id,))
+        if self.on_done:
+            self.on_done(user_id)
+
+    def _advance(self, user_id, removed):
+        if removed:
+            self.write_queue.execute(
+                'UPDATE user_purge SET removed_sales = removed_sales + ? WHERE user_id = ?',
+                (removed, user_id)
+            )
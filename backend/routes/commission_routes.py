@@ -0,0 +1,68 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from backend.models import CommissionRule
+from backend.wire import Table, table_response
+from backend.routes.sales_routes import query_sales, sale_filters, compress_min_bytes
+
+commission_bp = Blueprint('commission', __name__)
+
+RULE_COLUMNS = ['id', 'name', 'rate', 'threshold', 'description', 'is_active']
+
+# ?group= -> (key column name, SQL expression)
+SUMMARY_GROUPS = {
+    'rep': ('salesperson', 'u.username'),
+    'product': ('product_name', 'p.name'),
+}
+
+SUMMARY_COLUMNS = ['sales', 'amount', 'commission']
+
+# ------------------------------
+# Rules
+# ------------------------------
+@commission_bp.route('/rules', methods=['GET'])
+@jwt_required()
+def list_rules():
+    """Commission rules (the CommissionRule model), in the negotiated wire format"""
+    rules = CommissionRule.query.order_by(CommissionRule.name).all()
+    rows = [tuple(getattr(rule, column) for column in RULE_COLUMNS) for rule in rules]
+    table = Table.from_rows(RULE_COLUMNS, rows, floats=('rate', 'threshold'))
+    return table_response(table, request, compress_min_bytes())
+
+# ------------------------------
+# Payout summaries
+# ------------------------------
+@commission_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def payout_summary():
+    """
+    Sales count, amount and commission per rep or product, largest commission
+    first. Query params: group (rep|product), start, end, user_id (admins only)
+    """
+    group = request.args.get('group', 'rep')
+    if group not in SUMMARY_GROUPS:
+        return jsonify({'message': 'Invalid group'}), 400
+    key, expression = SUMMARY_GROUPS[group]
+    conditions, params, start, end, error = sale_filters()
+    if error:
+        return error
+
+    rows = query_sales(f'''
+        SELECT {expression}, COUNT(*), COALESCE(SUM(s.amount), 0), COALESCE(SUM(s.commission_amount), 0)
+        FROM {{sale}} s
+        JOIN user u ON s.user_id = u.id
+        JOIN product p ON s.product_id = p.id
+        WHERE {conditions}
+        GROUP BY {expression}
+    ''', params, start, end)
+
+    # Each partition aggregates separately; merge them. The Flask Sale model leaves
+    # commission_amount NULL until calculate_commission runs, hence the COALESCE
+    totals = {}
+    for name, sales, amount, commission in rows:
+        current = totals.get(name, (0, 0, 0))
+        totals[name] = (current[0] + sales, current[1] + amount, current[2] + commission)
+    ordered = sorted(totals.items(), key=lambda item: item[1][2], reverse=True)
+
+    table = Table.from_rows([key] + SUMMARY_COLUMNS, [(name,) + values for name, values in ordered],
+                            floats=('amount', 'commission'))
+    return table_response(table, request, compress_min_bytes())
@@ -0,0 +1,91 @@
+from flask import Blueprint, current_app, jsonify, request, send_file
+from backend.auth import admin_required
+from backend.db import db
+from backend.jobs import JobScheduler, JOB_STATUSES
+from backend.job_handlers import JOB_KINDS, register_jobs, validate_params
+from backend.partitions import SalePartitions
+from backend.routes.sales_routes import leaderboards
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def init_jobs(app):
+    """Create the app's job scheduler; workers start unless JOB_WORKERS is 0"""
+    with app.app_context():
+        db_path = db.engine.url.database
+    scheduler = JobScheduler(db_path, workers=app.config.get('JOB_WORKERS', 2))
+    register_jobs(scheduler, SalePartitions(db_path), on_rollups_rebuilt=leaderboards.clear)
+    if scheduler.workers:
+        scheduler.start()
+    app.extensions['jobs'] = scheduler
+
+def get_scheduler():
+    return current_app.extensions['jobs']
+
+# ------------------------------
+# Jobs
+# ------------------------------
+@jobs_bp.route('', methods=['POST'])
+@admin_required
+def enqueue_job():
+    """Queue a job. Body: {"kind": ..., "params": {...}, "priority": 0}; returns 202 with its id"""
+    data = request.get_json() or {}
+    kind = data.get('kind')
+    if kind not in JOB_KINDS:
+        return jsonify({'message': f"Unknown job kind, expected one of: {', '.join(JOB_KINDS)}"}), 400
+    params = data.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({'message': 'params must be an object'}), 400
+    try:
+        params = validate_params(kind, params)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    priority = data.get('priority', 0)
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        return jsonify({'message': 'priority must be an integer'}), 400
+
+    job_id = get_scheduler().enqueue(kind, params, priority=priority)
+    return jsonify({'id': job_id, 'status': 'queued'}), 202
+
+@jobs_bp.route('', methods=['GET'])
+@admin_required
+def list_jobs():
+    """Recent jobs, newest first. Query params: status, kind, limit"""
+    status = request.args.get('status')
+    if status and status not in JOB_STATUSES:
+        return jsonify({'message': 'Invalid status'}), 400
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    return jsonify({'jobs': get_scheduler().jobs(limit, status, request.args.get('kind'))})
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@admin_required
+def job_status(job_id):
+    """Status, progress and (once done) result of one job"""
+    job = get_scheduler().status(job_id)
+    if not job:
+        return jsonify({'message': 'Job not found'}), 404
+    return jsonify(job)
+
+@jobs_bp.route('/<int:job_id>', methods=['DELETE'])
+@admin_required
+def cancel_job(job_id):
+    """Cancel a queued job or stop a running one"""
+    if not get_scheduler().cancel(job_id):
+        return jsonify({'message': 'Job not found or already finished'}), 409
+    return jsonify({'id': job_id, 'status': 'cancelling'})
+
+@jobs_bp.route('/<int:job_id>/files/<path:filename>', methods=['GET'])
+@admin_required
+def job_file(job_id, filename):
+    """Download a file produced by a finished job"""
+    path = get_scheduler().output_file(job_id, filename)
+    if not path:
+        return jsonify({'message': 'File not found'}), 404
+    return send_file(path, as_attachment=True)
+
+# ------------------------------
+# Schedules
+# ------------------------------
+@jobs_bp.route('/schedules', methods=['GET'])
+@admin_required
+def list_schedules():
+    return jsonify({'schedules': get_scheduler().schedules()})
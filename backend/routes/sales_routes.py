@@ -0,0 +1,212 @@
+import threading
+import time
+from datetime import date
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from backend.auth import get_current_user
+from backend.db import db
+from backend.partitions import SalePartitions
+from backend.leaderboard import LeaderboardStore, ALL_TIME, DIMENSIONS, METRICS
+from backend.wire import Table, table_response, COMPRESS_MIN_BYTES
+
+sales_bp = Blueprint('sales', __name__)
+
+# Shared by all requests in this process; kept current by get_leaderboards()
+leaderboards = LeaderboardStore()
+
+# Seconds between full leaderboard reloads, which pick up renamed users
+LEADERBOARD_MAX_AGE = 300
+
+LEADERBOARD_ROWS = '''
+    SELECT s.id, u.username, p.name, c.name, s.amount, s.commission_amount, s.sale_date
+    FROM {sale} s
+    JOIN user u ON s.user_id = u.id
+    JOIN product p ON s.product_id = p.id
+    JOIN customer c ON s.customer_id = c.id
+    WHERE u.deleted_at IS NULL
+'''
+
+# What the store was built from: highest sale id applied, user marker, load time
+_leaderboard_sync = {'sale_id': 0, 'users': None, 'loaded_at': 0}
+_leaderboard_lock = threading.Lock()
+
+SALE_LIST_COLUMNS = ['id', 'salesperson', 'customer_name', 'product_name',
+                     'amount', 'commission_amount', 'sale_date']
+
+# GET /api/sales page size (?limit=)
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+def query_sales(sql, params=(), start=None, end=None, limit=None):
+    """
+    Run sql (with {sale} for the table) over the hot table and the archives
+    overlapping [start, end]. With limit, stops reading (and opening archives)
+    once that many rows are collected.
+    """
+    # The Sale model only maps the hot table; closed periods live in archive files
+    partitions = SalePartitions(db.engine.url.database)
+    conn = db.engine.raw_connection()
+    cursors = partitions.cursors(conn, sql, params, start, end)
+    try:
+        rows = []
+        for cursor in cursors:
+            rows.extend(cursor.fetchall() if limit is None else cursor.fetchmany(limit - len(rows)))
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+    finally:
+        cursors.close()  # detaches the archive still attached, if any
+        conn.close()
+
+def sale_filters():
+    """
+    (conditions, params, start, end, error) from the start/end/user_id query
+    params; sales reps are always limited to their own sales
+    """
+    user = get_current_user()
+    if not user:
+        return None, None, None, None, (jsonify({'message': 'User not found'}), 404)
+    try:
+        start = request.args.get('start') and date.fromisoformat(request.args['start']).isoformat()
+        end = request.args.get('end') and date.fromisoformat(request.args['end']).isoformat()
+    except ValueError:
+        return None, None, None, None, (jsonify({'message': 'Dates must be YYYY-MM-DD'}), 400)
+
+    conditions, params = ['u.deleted_at IS NULL'], []
+    user_id = request.args.get('user_id', type=int) if user.role == 'admin' else user.id
+    if user_id:
+        conditions.append('s.user_id = ?')
+        params.append(user_id)
+    if start:
+        conditions.append('s.sale_date >= ?')
+        params.append(start)
+    if end:
+        conditions.append('s.sale_date <= ?')
+        params.append(end)
+    return ' AND '.join(conditions), params, start, end, None
+
+def compress_min_bytes():
+    return current_app.config.get('COMPRESS_MIN_BYTES', COMPRESS_MIN_BYTES)
+
+def get_leaderboards():
+    """
+    Get the leaderboard store, kept in step with the database whichever process
+    writes to it: sales added since the last call are applied incrementally
+    (new sales get higher ids and only ever land in the hot table), and the
+    store is rebuilt when a user was deleted, on the first call after a clear()
+    and every LEADERBOARD_MAX_AGE seconds.
+    """
+    with _leaderboard_lock:
+        sync = _leaderboard_sync
+        conn = db.engine.raw_connection()
+        try:
+            users = tuple(conn.execute('SELECT COUNT(*), COUNT(deleted_at), MAX(deleted_at) FROM user').fetchone())
+            reload = (not leaderboards.loaded or users != sync['users']
+                      or time.monotonic() - sync['loaded_at'] > LEADERBOARD_MAX_AGE)
+            if reload:
+                rows = query_sales(LEADERBOARD_ROWS)
+            else:
+                rows = conn.execute(LEADERBOARD_ROWS.format(sale='main.sale') + ' AND s.id > ?',
+                                    (sync['sale_id'],)).fetchall()
+        finally:
+            conn.close()
+
+        # The mark only advances to ids actually applied, so no sale is counted twice
+        newest = max((row[0] for row in rows), default=0 if reload else sync['sale_id'])
+        if reload:
+            leaderboards.load(row[1:] for row in rows)
+            sync.update(users=users, loaded_at=time.monotonic())
+        else:
+            leaderboards.record_sales(row[1:] for row in rows)
+        sync['sale_id'] = newest
+    return leaderboards
+
+# ------------------------------
+# Sales
+# ------------------------------
+@sales_bp.route('', methods=['GET'])
+@jwt_required()
+def list_sales():
+    """
+    One page of sales (including archived periods), newest first. Query params:
+    start, end (YYYY-MM-DD, inclusive), user_id (admins only), limit (default
+    DEFAULT_PAGE_SIZE, at most MAX_PAGE_SIZE) and cursor. When more sales
+    follow, the X-Next-Cursor header holds the cursor for the next page.
+
+    The body is negotiated from Accept (or ?format=json|columnar|arrow) and
+    compressed per Accept-Encoding; see backend.wire.
+    """
+    conditions, params, start, end, error = sale_filters()
+    if error:
+        return error
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+    # Keyset paging: the cursor is the (sale_date, id) of the last sale already sent
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_date, cursor_id = cursor.split(':')
+            cursor_date, cursor_id = date.fromisoformat(cursor_date).isoformat(), int(cursor_id)
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        conditions += ' AND (s.sale_date < ? OR (s.sale_date = ? AND s.id < ?))'
+        params += [cursor_date, cursor_date, cursor_id]
+        # Later archives can't hold anything before the cursor
+        end = min(end, cursor_date) if end else cursor_date
+
+    rows = query_sales(f'''
+        SELECT s.id, u.username, c.name, p.name, s.amount, s.commission_amount, s.sale_date
+        FROM {{sale}} s
+        JOIN user u ON s.user_id = u.id
+        JOIN customer c ON s.customer_id = c.id
+        JOIN product p ON s.product_id = p.id
+        WHERE {conditions}
+        ORDER BY s.sale_date DESC, s.id DESC
+        LIMIT ?
+    ''', params + [limit], start, end, limit)
+
+    table = Table.from_rows(SALE_LIST_COLUMNS, rows,
+                            dictionary=('salesperson', 'product_name'), dates=('sale_date',),
+                            floats=('amount', 'commission_amount'))
+    response = table_response(table, request, compress_min_bytes())
+    if len(rows) == limit and response.status_code == 200:
+        last = rows[-1]
+        response.headers['X-Next-Cursor'] = f'{str(last[6])[:10]}:{last[0]}'
+    return response
+
+# ------------------------------
+# Leaderboards
+# ------------------------------
+@sales_bp.route('/leaderboard', methods=['GET'])
+@jwt_required()
+def leaderboard():
+    """
+    Top-N for a dimension, or the rank of one member when ?member= is given.
+    Query params: dimension (rep|product|customer), period (YYYY-MM|all),
+    metric (amount|commission), limit, member
+    """
+    dimension = request.args.get('dimension', 'rep')
+    period = request.args.get('period', ALL_TIME)
+    metric = request.args.get('metric', 'amount')
+    if dimension not in DIMENSIONS or metric not in METRICS:
+        return jsonify({'message': 'Invalid dimension or metric'}), 400
+
+    store = get_leaderboards()
+    member = request.args.get('member')
+    if member:
+        ranking = store.rank(dimension, member, period, metric)
+        if not ranking:
+            return jsonify({'message': 'No sales for member in period'}), 404
+        rank, score, size = ranking
+        return jsonify({'member': member, 'rank': rank, 'score': score, 'size': size})
+
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    return jsonify({
+        'dimension': dimension,
+        'period': period,
+        'metric': metric,
+        'entries': [
+            {'rank': i + 1, 'member': name, 'score': score}
+            for i, (name, score) in enumerate(store.top(dimension, limit, period, metric))
+        ]
+    })
@@ -0,0 +1,3 @@
+from flask import Blueprint
+
+user_bp = Blueprint('users', __name__)
@@ -0,0 +1,96 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# One scenario's outcome. by_rep arrays line up with SalesHistory.reps; by_product
+# arrays are indexed by product id. Totals are (current, simulated) payouts.
+ScenarioResult = namedtuple('ScenarioResult', [
+    'name', 'repriced_sales', 'current_total', 'simulated_total',
+    'by_rep_current', 'by_rep_delta', 'by_product_current', 'by_product_delta',
+])
+
+
+class SalesHistory:
+    """
+    Column arrays of every sale a scenario is evaluated against, loaded once and
+    shared read-only by all scenarios (so concurrent evaluation needs no locks).
+
+    rep_codes index into reps (the salesperson names); product_ids are the
+    product dimension keys.
+    """
+
+    def __init__(self, reps, rep_codes, product_ids, amounts, commissions):
+        self.reps = list(reps)
+        self.rep_codes = np.asarray(rep_codes, dtype='int64')
+        self.product_ids = np.asarray(product_ids, dtype='int64')
+        self.amounts = np.asarray(amounts, dtype='float64')
+        self.commissions = np.asarray(commissions, dtype='float64')
+        self.product_count = int(self.product_ids.max()) + 1 if len(self.product_ids) else 1
+        # Current payouts, computed once for every scenario's deltas
+        self.by_rep_current = np.bincount(self.rep_codes, self.commissions, minlength=len(self.reps))
+        self.by_product_current = np.bincount(self.product_ids, self.commissions, minlength=self.product_count)
+
+    def __len__(self):
+        return len(self.amounts)
+
+
+def _rule_tables(history, rules):
+    """Per-product lookup arrays (rate %, min, max) for one scenario; NaN rate = no rule"""
+    size = history.product_count
+    rates = np.full(size, np.nan)
+    minimums = np.zeros(size)
+    maximums = np.full(size, np.inf)
+    for rule in rules:
+        product_id = rule['product_id']
+        if product_id >= size:
+            continue  # no sales to re-price
+        rates[product_id] = rule['commission_rate']
+        minimums[product_id] = rule.get('min_amount') or 0
+        if rule.get('max_amount') is not None:
+            maximums[product_id] = rule['max_amount']
+    return rates, minimums, maximums
+
+
+def evaluate(history, rules, name=None):
+    """
+    Re-price history under candidate rules (dicts with product_id,
+    commission_rate in %, min_amount, max_amount; max_amount None = no limit).
+
+    A sale is re-priced when its product has a candidate rule and its amount is
+    within [min_amount, max_amount]; every other sale keeps the commission it
+    was paid, so the deltas show the effect of the candidate rules alone.
+    """
+    rates, minimums, maximums = _rule_tables(history, rules)
+    product_ids, amounts = history.product_ids, history.amounts
+
+    # One vectorized pass over all sales picks those of ruled products; the
+    # amount bounds and new commissions are only computed for that subset
+    candidates = np.flatnonzero(~np.isnan(rates)[product_ids])
+    candidate_products = product_ids[candidates]
+    candidate_amounts = amounts[candidates]
+    within = ((candidate_amounts >= minimums[candidate_products])
+              & (candidate_amounts <= maximums[candidate_products]))
+    matched = candidates[within]
+
+    delta = (candidate_amounts[within] * (rates[candidate_products[within]] / 100)
+             - history.commissions[matched])
+    by_rep_delta = np.bincount(history.rep_codes[matched], delta, minlength=len(history.reps))
+    by_product_delta = np.bincount(product_ids[matched], delta, minlength=history.product_count)
+
+    current_total = float(history.commissions.sum())
+    return ScenarioResult(
+        name, len(matched), current_total, current_total + float(delta.sum()),
+        history.by_rep_current, by_rep_delta, history.by_product_current, by_product_delta,
+    )
+
+
+def simulate(history, scenarios, max_workers=4):
+    """
+    Evaluate several scenarios ({name: rules}) in parallel; returns results in
+    the order given. numpy releases the GIL for the array work, so threads
+    share the history arrays without copying them.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(scenarios)))) as pool:
+        futures = [pool.submit(evaluate, history, rules, name) for name, rules in scenarios.items()]
+        return [future.result() for future in futures]
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class ReportingSnapshot:
+    """
+    Read-only copy of the primary database for reports.
+
+    The copy is taken with SQLite's online backup API into a temporary file and
+    swapped in with os.replace(), so connections already reading the previous
+    copy finish undisturbed and the primary only sees one short read
+    transaction per refresh (which doesn't block writers in WAL mode).
+
+    A refresh happens:
+      * on a schedule, every max_staleness / 2 seconds, once start() is called;
+      * in the background after refresh_after_writes writes (see note_writes)
+        or invalidate(), while readers keep using the previous copy;
+      * synchronously in connect() when there is no copy yet or it is older
+        than max_staleness, so readers never see data older than the bound.
+    """
+
+    def __init__(self, db_path, snapshot_path=None, max_staleness=10.0, refresh_after_writes=500):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path or os.path.splitext(db_path)[0] + '_report.db'
+        self.max_staleness = max_staleness
+        self.refresh_after_writes = refresh_after_writes
+        self.refreshed_at = None
+        self._writes = 0
+        self._pending = False  # a background refresh was requested and hasn't started copying
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._scheduler = None
+
+    def connect(self):
+        """Open a read-only connection to a copy no older than max_staleness"""
+        if self.is_stale():
+            self.refresh(only_if_stale=True)
+        return sqlite3.connect(f'file:{self.snapshot_path}?mode=ro', uri=True, check_same_thread=False)
+
+    def is_stale(self):
+        with self._lock:
+            if self.refreshed_at is None:
+                return True
+            return time.monotonic() - self.refreshed_at > self.max_staleness
+
+    def covers(self, moment):
+        """True if the current copy was taken after moment (a time.monotonic() value)"""
+        with self._lock:
+            return self.refreshed_at is not None and self.refreshed_at >= moment
+
+    def note_writes(self, count=1):
+        """Record writes to the primary; refreshes in the background every refresh_after_writes"""
+        with self._lock:
+            self._writes += count
+            due = self._writes >= self.refresh_after_writes
+        if due:
+            self._refresh_in_background()
+
+    def invalidate(self):
+        """
+        Take a new copy in the background for a write that should show up soon
+        (an edit, a purge). Readers keep the previous copy until it is in place;
+        use covers() to send the writer's own reads to the primary meanwhile.
+        """
+        self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._pending:
+                return  # the requested refresh hasn't started copying, so it will include this write
+            self._pending = True
+        threading.Thread(target=self._catch_up, name='report-snapshot-refresh', daemon=True).start()
+
+    def _catch_up(self):
+        try:
+            # Waits for a copy already running: it may have started before the write
+            self.refresh(only_if_pending=True)
+        except (sqlite3.Error, OSError):
+            with self._lock:
+                self._pending = False  # the scheduled refresh will try again
+
+    def refresh(self, blocking=True, only_if_stale=False, only_if_pending=False):
+        """Copy the primary into a fresh snapshot; returns False if skipped because one is running"""
+        if not self._refreshing.acquire(blocking=blocking):
+            return False
+        try:
+            # Another thread may have refreshed while we waited for the lock
+            if only_if_stale and not self.is_stale():
+                return True
+            with self._lock:
+                if only_if_pending and not self._pending:
+                    return True
+                started, self._writes, self._pending = time.monotonic(), 0, False
+
+            tmp_path = self.snapshot_path + '.tmp'
+            source = sqlite3.connect(self.db_path)
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target)
+                # Readers open the copy read-only, which a WAL-mode file can't support
+                target.execute('PRAGMA journal_mode = DELETE')
+            finally:
+                target.close()
+                source.close()
+            os.replace(tmp_path, self.snapshot_path)
+
+            with self._lock:
+                self.refreshed_at = started
+            return True
+        finally:
+            self._refreshing.release()
+
+    def start(self):
+        """Refresh on a schedule from a daemon thread"""
+        if self._scheduler is not None:
+            return
+        self._scheduler = threading.Thread(target=self._schedule, name='report-snapshot', daemon=True)
+        self._scheduler.start()
+
+    def _schedule(self):
+        while True:
+            try:
+                self.refresh(blocking=False)
+            except sqlite3.Error:
+                pass  # readers refresh synchronously if the copy goes stale
+            time.sleep(self.max_staleness / 2)
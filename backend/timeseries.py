@@ -0,0 +1,81 @@
+from datetime import date
+
+BUCKETS = ('day', 'week', 'month', 'quarter')
+
+# SQLite expressions mapping a sale_date to the first day of its bucket
+BUCKET_SQL = {
+    'day': "date({col})",
+    'week': "date({col}, '-6 days', 'weekday 1')",  # Monday on or before
+    'month': "strftime('%Y-%m-01', {col})",
+    'quarter': "printf('%s-%02d-01', strftime('%Y', {col}), "
+               "(CAST(strftime('%m', {col}) AS INTEGER) - 1) / 3 * 3 + 1)",
+}
+
+# Longest visible range (in days) for which each bucket is chosen automatically
+AUTO_BUCKET_DAYS = (
+    ('day', 92),
+    ('week', 731),
+    ('month', 366 * 15),
+)
+
+MAX_CHART_POINTS = 2000
+
+
+def choose_bucket(start, end):
+    """Pick the finest bucket that keeps a start..end range to a readable number of points"""
+    days = (end - start).days + 1
+    for bucket, limit in AUTO_BUCKET_DAYS:
+        if days <= limit:
+            return bucket
+    return 'quarter'
+
+
+def bucket_expression(bucket, column='sale_date'):
+    """SQL expression grouping column into the given bucket"""
+    if bucket not in BUCKET_SQL:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    return BUCKET_SQL[bucket].format(col=column)
+
+
+def lttb_indices(xs, ys, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of at most threshold points that preserve the visual shape
+    of the series; first and last points are always kept.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third vertex of the triangle
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_len = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / avg_len
+        avg_y = sum(ys[avg_start:avg_end]) / avg_len
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = range_start, -1.0
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+
+def downsample_series(dates, values, threshold=MAX_CHART_POINTS):
+    """Downsample parallel date/value lists with LTTB, returning new (dates, values) lists"""
+    xs = [d.toordinal() if isinstance(d, date) else date.fromisoformat(d).toordinal()
+          for d in dates]
+    keep = lttb_indices(xs, values, threshold)
+    return [dates[i] for i in keep], [values[i] for i in keep]
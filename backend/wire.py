@@ -0,0 +1,200 @@
+import gzip
+import json
+from datetime import date
+
+from flask import Response
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow responses are only offered when pyarrow is installed
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is only offered when zstandard is installed
+    zstandard = None
+
+JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.sales.columnar+json'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# ?format= shortcuts for clients that can't set Accept
+FORMATS = {'json': JSON, 'columnar': COLUMNAR_JSON, 'arrow': ARROW_STREAM}
+
+# Bodies smaller than this are sent uncompressed (overhead outweighs the saving)
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class Table:
+    """
+    A query result held column-wise. dictionary names low-cardinality text
+    columns (sent as integer codes plus one list of distinct values); dates
+    names ISO date columns (sent as days since 1970-01-01); floats names
+    numeric columns typed as float64 in Arrow whatever values SQLite returned.
+    """
+
+    def __init__(self, names, columns, dictionary=(), dates=(), floats=()):
+        self.names = list(names)
+        self.columns = [list(column) for column in columns]
+        self.dictionary = set(dictionary) & set(self.names)
+        self.dates = set(dates) & set(self.names)
+        self.floats = set(floats) & set(self.names)
+
+    @classmethod
+    def from_rows(cls, names, rows, dictionary=(), dates=(), floats=()):
+        columns = list(zip(*rows)) or [() for _ in names]
+        return cls(names, columns, dictionary, dates, floats)
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+
+def dictionary_encode(values):
+    """(codes, distinct values in first-seen order)"""
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return codes, list(index)
+
+
+def date_days(values):
+    """ISO date strings (or None) -> days since 1970-01-01; each distinct date is parsed once"""
+    days = {None: None}
+    for value in set(values):
+        if value is not None:
+            days[value] = date.fromisoformat(value[:10]).toordinal() - EPOCH_ORDINAL
+    return [days[value] for value in values]
+
+
+# ------------------------------
+# Encoders
+# ------------------------------
+def encode_json(table):
+    """The row-dict layout: one object per row, every key repeated"""
+    names = table.names
+    return json.dumps([dict(zip(names, row)) for row in zip(*table.columns)]).encode()
+
+
+def encode_columnar_json(table):
+    """
+    {"rows": n, "columns": {name: [...]}, "dictionaries": {name: [...]},
+     "encodings": {name: "dictionary" | "days"}}
+    """
+    columns, dictionaries, encodings = {}, {}, {}
+    for name, values in zip(table.names, table.columns):
+        if name in table.dictionary:
+            columns[name], dictionaries[name] = dictionary_encode(values)
+            encodings[name] = 'dictionary'
+        elif name in table.dates:
+            columns[name] = date_days(values)
+            encodings[name] = 'days'
+        else:
+            columns[name] = values
+    return json.dumps({
+        'rows': len(table),
+        'columns': columns,
+        'dictionaries': dictionaries,
+        'encodings': encodings,
+    }, separators=(',', ':')).encode()
+
+
+def encode_arrow(table):
+    """Arrow IPC stream: dictionary-encoded text columns and date32 dates"""
+    arrays = []
+    for name, values in zip(table.names, table.columns):
+        if name in table.dictionary:
+            codes, distinct = dictionary_encode(values)
+            arrays.append(pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), pa.array(distinct)))
+        elif name in table.dates:
+            arrays.append(pa.array(date_days(values), pa.date32()))
+        elif name in table.floats:
+            arrays.append(pa.array(values, pa.float64()))
+        else:
+            arrays.append(pa.array(values))
+    batch = pa.record_batch(arrays, names=table.names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {JSON: encode_json, COLUMNAR_JSON: encode_columnar_json, ARROW_STREAM: encode_arrow}
+
+
+def available_formats():
+    """Media types this process can produce, preferred default first"""
+    return [JSON, COLUMNAR_JSON] + ([ARROW_STREAM] if pa is not None else [])
+
+
+def available_encodings():
+    """Content-Encodings this process can produce, most preferred first"""
+    return (['zstd'] if zstandard is not None else []) + ['gzip']
+
+
+# ------------------------------
+# Compression
+# ------------------------------
+def accepted_encodings(header):
+    """Codings from an Accept-Encoding header with a non-zero q-value"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def compress(body, accept_encoding, min_bytes=COMPRESS_MIN_BYTES):
+    """(body, Content-Encoding or None): zstd if accepted and available, else gzip, above min_bytes"""
+    if len(body) < min_bytes:
+        return body, None
+    accepted = accepted_encodings(accept_encoding)
+    for coding in available_encodings():
+        if coding in accepted or '*' in accepted:
+            if coding == 'zstd':
+                return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), coding
+            return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), coding
+    return body, None
+
+
+# ------------------------------
+# Flask responses
+# ------------------------------
+def negotiate(request):
+    """Media type for a request (?format= wins over Accept), or None if none can be served"""
+    offered = available_formats()
+    requested = request.args.get('format')
+    if requested:
+        mimetype = FORMATS.get(requested)
+        return mimetype if mimetype in offered else None
+    if not request.accept_mimetypes:
+        return JSON
+    return request.accept_mimetypes.best_match(offered)
+
+
+def table_response(table, request, min_bytes=COMPRESS_MIN_BYTES):
+    """Encode a Table in the negotiated format, compressed when worthwhile; 406 if unsupported"""
+    mimetype = negotiate(request)
+    if mimetype is None:
+        return Response(json.dumps({
+            'message': 'Not acceptable',
+            'formats': available_formats(),
+        }), status=406, mimetype=JSON)
+
+    body, encoding = compress(ENCODERS[mimetype](table), request.headers.get('Accept-Encoding'), min_bytes)
+    response = Response(body, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    response.headers['X-Row-Count'] = str(len(table))
+    return response
@@ -0,0 +1,183 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+WriteResult = namedtuple('WriteResult', ['lastrowid', 'rowcount'])
+
+_STOP = object()
+
+
+class QueueFullError(Exception):
+    """Raised when a write cannot be queued before the backpressure timeout"""
+
+
+class WriteQueue:
+    """
+    Write-behind queue with group commit.
+
+    Callers submit statements and get a Future back; a single writer thread owns
+    the only write connection and drains pending statements into one
+    transaction per batch, committing when max_batch statements have been
+    collected or max_delay seconds have passed since the first one. Every
+    future in a batch resolves (with a WriteResult) only after its COMMIT, so
+    a resolved future means the row is durable. A statement that fails only
+    fails its own future; the rest of the batch still commits.
+
+    The queue is bounded: when max_pending writes are waiting, submit() blocks
+    for up to block_timeout seconds and then raises QueueFullError.
+
+    on_commit, if given, is called from the writer thread with the number of
+    statements in each committed batch.
+
+    The writer thread survives any error: a batch that fails unexpectedly fails
+    its futures and is logged, the connection is reopened for the next batch,
+    and a thread that died anyway is restarted by the next submit().
+    """
+
+    def __init__(self, db_path, max_batch=200, max_delay=0.005, max_pending=5000,
+                 block_timeout=2.0, on_commit=None):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.block_timeout = block_timeout
+        self.on_commit = on_commit
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.writes = 0
+
+    # ------------------------------
+    # Producer side
+    # ------------------------------
+    def submit(self, sql, params=(), timeout=None):
+        """Queue one statement; returns a Future resolving to WriteResult once committed"""
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put((sql, params, future), timeout=self.block_timeout if timeout is None else timeout)
+        except queue.Full:
+            raise QueueFullError(f'{self._queue.maxsize} writes already pending')
+        return future
+
+    def execute(self, sql, params=(), timeout=30):
+        """Queue one statement and wait for its commit"""
+        return self.submit(sql, params).result(timeout)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def close(self):
+        """Flush everything queued so far and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sale-writer', daemon=True)
+                self._thread.start()
+
+    # ------------------------------
+    # Writer thread
+    # ------------------------------
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA busy_timeout = 5000')
+        # WAL lets readers keep going while a batch commits. It also means a commit
+        # spanning ATTACHed files isn't atomic, which SalePartitions allows for
+        conn.execute('PRAGMA journal_mode = WAL')
+        return conn
+
+    def _run(self):
+        conn = None
+        try:
+            while True:
+                batch, stop = self._collect()
+                if batch:
+                    try:
+                        if conn is None:
+                            conn = self._connect()
+                        self._commit(conn, batch)
+                    except Exception as e:
+                        logger.exception('Write batch of %d statements failed', len(batch))
+                        for _, _, future in batch:
+                            if not future.done():
+                                future.set_exception(e)
+                        # Start over on a fresh connection; this one may be mid-transaction
+                        if conn is not None:
+                            conn.close()
+                            conn = None
+                if stop:
+                    return
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _collect(self):
+        """Block for the first write, then gather more until the batch is full or max_delay passes"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, conn, batch):
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for sql, params, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    cursor = conn.execute(sql, params)
+                    results.append((future, WriteResult(cursor.lastrowid, cursor.rowcount)))
+                except sqlite3.Error as e:
+                    # Usually only the failed statement is rolled back; keep the batch
+                    future.set_exception(e)
+                    if not conn.in_transaction:
+                        # SQLite rolled back the whole transaction (BUSY, FULL, IOERR...):
+                        # the rest must not run in autocommit and then be reported as failed
+                        raise
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for future, _ in results:
+                future.set_exception(e)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.writes += len(results)
+        for future, result in results:
+            future.set_result(result)
+        if self.on_commit and results:
+            try:
+                self.on_commit(len(results))
+            except Exception:
+                # The batch is already committed and its futures resolved
+                logger.exception('on_commit callback failed')
@@ -0,0 +1,88 @@
+"""
+What-if commission simulator benchmark.
+
+Builds a synthetic history of --sales sales (--reps reps, --products products)
+in memory and evaluates --scenarios candidate rule sets against it, first one
+after another and then in parallel with backend.simulator.simulate(). Loading
+the history from SQLite is not timed; the app does that once and caches it.
+
+Usage: python benchmarks/simulator_bench.py [--sales 10000000] [--scenarios 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.simulator import SalesHistory, evaluate, simulate  # noqa: E402
+
+
+def make_history(sales, reps, products, seed=7):
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.lognormal(8, 1, sales), 2)
+    rates = rng.choice([5.0, 8.0, 10.0, 12.0], products)
+    product_ids = rng.integers(1, products, sales)
+    return SalesHistory(
+        [f'rep{i}' for i in range(reps)],
+        rng.integers(0, reps, sales),
+        product_ids,
+        amounts,
+        amounts * rates[product_ids] / 100,
+    )
+
+
+def make_scenarios(count, products, seed=11):
+    rng = np.random.default_rng(seed)
+    return {
+        f'scenario {i + 1}': [
+            {
+                'product_id': int(product_id),
+                'commission_rate': float(rng.choice([4.0, 6.0, 9.0, 11.0, 15.0])),
+                'min_amount': float(rng.choice([0, 1000, 5000])),
+                'max_amount': None if rng.random() < 0.5 else float(rng.choice([20000, 50000])),
+            }
+            for product_id in rng.choice(np.arange(1, products), size=min(products - 1, 20), replace=False)
+        ]
+        for i in range(count)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sales', type=int, default=10_000_000)
+    parser.add_argument('--reps', type=int, default=500)
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--scenarios', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    history = make_history(args.sales, args.reps, args.products)
+    scenarios = make_scenarios(args.scenarios, args.products)
+    print(f'history: {len(history):,} sales built in {time.perf_counter() - started:.1f}s')
+
+    started = time.perf_counter()
+    sequential = [evaluate(history, rules, name) for name, rules in scenarios.items()]
+    sequential_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parallel = simulate(history, scenarios, max_workers=args.workers)
+    parallel_time = time.perf_counter() - started
+
+    for a, b in zip(sequential, parallel):
+        assert np.allclose(a.by_rep_delta, b.by_rep_delta)
+
+    print(f'{"strategy":<22}{"total":>10}{"per scenario":>15}')
+    print(f'{"sequential":<22}{sequential_time:>9.2f}s{sequential_time / len(scenarios):>14.3f}s')
+    print(f'{f"parallel ({args.workers} threads)":<22}{parallel_time:>9.2f}s{parallel_time / len(scenarios):>14.3f}s')
+    print()
+    for result in parallel[:3]:
+        print(f'{result.name}: {result.repriced_sales:,} sales re-priced, '
+              f'payout {result.current_total:,.0f} -> {result.simulated_total:,.0f}')
+
+
+if __name__ == '__main__':
+    main()
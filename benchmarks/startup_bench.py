@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark for the Streamlit app.
+
+Runs `python -X importtime` in a fresh interpreter for the modules needed to
+show the login page and fails if the cumulative import time exceeds the
+budget or if any heavy library (pandas, plotly) gets imported on the way.
+When Streamlit's AppTest is available it also times a full first run of
+complete_app.py up to the rendered login page.
+
+Usage: python benchmarks/startup_bench.py [--budget-ms 1500] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOGIN_IMPORTS = 'import complete_app, app_pages.login'
+HEAVY_MODULES = ('pandas', 'plotly', 'numpy')
+
+APPTEST_SNIPPET = '''
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("complete_app.py", default_timeout=60)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+'''
+
+
+def measure_imports(statement):
+    """Return (total_ms, {top-level module: cumulative_ms}, all module names) for one cold import"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name.strip())
+        # Top-level entries are the ones without nesting indentation
+        if not name.startswith('  ', 1):
+            modules[name.strip()] = int(cumulative) / 1000
+    return sum(modules.values()), modules, imported
+
+
+def measure_first_render():
+    """Seconds from interpreter start to the rendered login page, or None without AppTest"""
+    result = subprocess.run(
+        [sys.executable, '-c', APPTEST_SNIPPET],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=1500,
+                        help='maximum median import time for the login page')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total, modules, imported = measure_imports(LOGIN_IMPORTS)
+        totals.append(total)
+    median = statistics.median(totals)
+
+    print(f'login page imports: median {median:.1f} ms over {args.runs} runs '
+          f'(budget {args.budget_ms:.0f} ms)')
+    for name, ms in sorted(modules.items(), key=lambda item: -item[1])[:10]:
+        print(f'  {ms:8.1f} ms  {name}')
+
+    render = measure_first_render()
+    if render is not None:
+        print(f'time to login page (AppTest first run): {render * 1000:.0f} ms')
+
+    failures = []
+    heavy = [name for name in imported if name.split('.')[0] in HEAVY_MODULES]
+    if heavy:
+        failures.append(f'heavy modules imported before login: {", ".join(sorted(heavy))}')
+    if median > args.budget_ms:
+        failures.append(f'import time {median:.1f} ms exceeds budget {args.budget_ms:.0f} ms')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
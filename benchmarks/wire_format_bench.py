@@ -0,0 +1,90 @@
+"""
+Wire format benchmark for API list responses.
+
+Serialises --rows synthetic sales (the columns GET /api/sales returns) as the
+row-dict JSON baseline, columnar JSON and, when pyarrow is installed, an
+Arrow IPC stream; each body is then sent uncompressed, gzipped and, when
+zstandard is installed, zstd-compressed. Reports payload size and the time
+to produce it (encode + compress, best of --repeat) relative to the baseline.
+
+Usage: python benchmarks/wire_format_bench.py [--rows 100000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import wire  # noqa: E402
+
+
+def make_table(rows, reps=50, products=20, customers=2000, seed=7):
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    data = []
+    for sale_id in range(rows, 0, -1):
+        amount = round(rng.lognormvariate(8, 1), 2)
+        data.append((
+            sale_id,
+            f'rep{rng.randrange(reps):03d}',
+            f'Customer {rng.randrange(customers)}',
+            f'Product {rng.randrange(products)}',
+            amount,
+            round(amount * rng.choice((0.05, 0.08, 0.1, 0.12)), 2),
+            (start + timedelta(days=rng.randrange(1000))).isoformat(),
+        ))
+    return wire.Table.from_rows(
+        ['id', 'salesperson', 'customer_name', 'product_name', 'amount', 'commission_amount', 'sale_date'],
+        data, dictionary=('salesperson', 'product_name'), dates=('sale_date',),
+        floats=('amount', 'commission_amount'),
+    )
+
+
+def best_time(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    table = make_table(args.rows)
+    codings = [None, 'gzip'] + (['zstd'] if wire.zstandard is not None else [])
+    print(f'{len(table):,} sales; formats: {", ".join(wire.available_formats())}; '
+          f'compression: {", ".join(c for c in codings if c)}')
+    if wire.pa is None:
+        print('(install pyarrow for the Arrow stream, zstandard for zstd)')
+    print()
+
+    results = []
+    for mimetype in wire.available_formats():
+        encode = wire.ENCODERS[mimetype]
+        encode_time, body = best_time(lambda: encode(table), args.repeat)
+        for coding in codings:
+            if coding is None:
+                results.append((mimetype, 'identity', len(body), encode_time))
+                continue
+            compress_time, (payload, used) = best_time(
+                lambda: wire.compress(body, coding, min_bytes=0), args.repeat)
+            results.append((mimetype, used, len(payload), encode_time + compress_time))
+
+    base_size, base_time = results[0][2], results[0][3]
+    print(f'{"format":<40}{"encoding":<10}{"bytes":>13}{"size":>8}{"time":>10}{"vs base":>9}')
+    for mimetype, coding, size, elapsed in results:
+        print(f'{mimetype:<40}{coding:<10}{size:>13,}{size / base_size:>7.1%}'
+              f'{elapsed * 1000:>8.0f}ms{elapsed / base_time:>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Concurrent sale-entry benchmark: one transaction per sale vs. the group-commit WriteQueue.
+
+Simulates --users threads each submitting --sales-per-user sales against a
+scratch copy of the schema and reports throughput, p50/p99 latency and the
+number of "database is locked" failures. The queue always runs in WAL mode, so
+the per-sale baseline is measured both with the default rollback journal and
+with WAL: the WAL rows isolate the gain from group commit itself.
+
+Usage: python benchmarks/write_queue_bench.py [--users 50] [--sales-per-user 40]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.dimensions import SALE_DDL, ensure_dimensions  # noqa: E402
+from backend.write_queue import WriteQueue  # noqa: E402
+
+CUSTOMERS = 100
+
+INSERT = '''
+    INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# (label, sale writes, journal mode)
+STRATEGIES = (
+    ('direct', 'direct', 'delete'),
+    ('direct+wal', 'direct', 'wal'),
+    ('queue+wal', 'queue', 'wal'),
+)
+
+
+def create_schema(db_path, journal_mode):
+    conn = sqlite3.connect(db_path)
+    conn.execute(f'PRAGMA journal_mode = {journal_mode}')
+    ensure_dimensions(conn)
+    conn.execute(SALE_DDL.format(table='sale'))
+    conn.executemany('INSERT INTO customer (name) VALUES (?)', [(f'Customer {n}',) for n in range(CUSTOMERS)])
+    conn.execute("INSERT INTO product (name) VALUES ('Premium Package')")
+    conn.commit()
+    conn.close()
+
+
+def sale_params(user_id, n):
+    return (user_id, n % CUSTOMERS + 1, 1, 1000.0, 100.0, date.today().isoformat())
+
+
+def direct_insert(db_path, params):
+    """What add_sale used to do: its own connection and transaction per sale"""
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        conn.execute(INSERT, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run(label, strategy, db_path, users, sales_per_user):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    write_queue = WriteQueue(db_path) if strategy == 'queue' else None
+    barrier = threading.Barrier(users)
+
+    def user(user_id):
+        barrier.wait()
+        for n in range(sales_per_user):
+            params = sale_params(user_id, n)
+            start = time.perf_counter()
+            try:
+                if write_queue:
+                    write_queue.execute(INSERT, params)
+                else:
+                    direct_insert(db_path, params)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if write_queue:
+        write_queue.close()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float('nan')
+    print(f'{label:>10}: {len(latencies) / elapsed:8.0f} sales/s  '
+          f'p50 {statistics.median(latencies) * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms  '
+          f'locked/failed {len(errors)}'
+          + (f'  ({write_queue.batches} commits)' if write_queue else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--sales-per-user', type=int, default=40)
+    args = parser.parse_args()
+
+    for label, strategy, journal_mode in STRATEGIES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.db')
+            create_schema(db_path, journal_mode)
+            run(label, strategy, db_path, args.users, args.sales_per_user)
+
+
+if __name__ == '__main__':
+    main()
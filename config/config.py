@@ -11,6 +11,12 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
 
+    # Background job worker threads per process (0 = enqueue and poll only)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+    # API list responses smaller than this (bytes) are sent uncompressed
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
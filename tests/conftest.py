@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Flask app on a scratch database, with no job workers"""
+    from config.config import DevelopmentConfig
+    from backend.factory import create_app
+    from backend.routes import sales_routes
+
+    db_path = tmp_path / 'api.db'
+    monkeypatch.setattr(DevelopmentConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{db_path}')
+    monkeypatch.setattr(DevelopmentConfig, 'JOB_WORKERS', 0)
+    # The API leaderboards are process-wide; start each test from an empty store
+    sales_routes.leaderboards.clear()
+    app = create_app()
+    app.config['DB_PATH'] = str(db_path)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity='1')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def api_db(app):
+    conn = sqlite3.connect(app.config['DB_PATH'])
+    yield conn
+    conn.close()
@@ -0,0 +1,210 @@
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+from backend.dimensions import Dimension, migrate_to_dimensions
+from backend.partitions import SalePartitions
+
+# The sale table as the Streamlit app created it before customer/product ids
+STREAMLIT_SALE = '''
+    CREATE TABLE sale (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        customer_name VARCHAR(100) NOT NULL,
+        product_name VARCHAR(100) NOT NULL,
+        amount DECIMAL(10,2) NOT NULL,
+        commission_amount DECIMAL(10,2) NOT NULL,
+        sale_date DATE NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES user (id)
+    )
+'''
+
+STREAMLIT_RULE = '''
+    CREATE TABLE commission_rule (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_name VARCHAR(100) NOT NULL,
+        commission_rate DECIMAL(5,2) NOT NULL,
+        min_amount DECIMAL(10,2) DEFAULT 0,
+        max_amount DECIMAL(10,2),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+# ... and as db.create_all() created it from the Flask Sale model
+FLASK_SALE = '''
+    CREATE TABLE sale (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        customer_name VARCHAR(100) NOT NULL,
+        product_name VARCHAR(100) NOT NULL,
+        amount FLOAT NOT NULL,
+        sale_date DATE NOT NULL,
+        commission_rate FLOAT,
+        commission_amount FLOAT,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user (id)
+    )
+'''
+
+SALES = [
+    (1, 2, 'Acme Corp', 'Laptop', 1000, 50, '2023-02-01'),
+    (2, 2, ' ACME corp ', 'laptop', 2000, 100, '2023-05-01'),
+    (3, 3, 'Globex', 'Software License', 500, 40, '2023-05-02'),
+    (4, 3, 'Initech', 'Laptop ', 750, 37.5, date.today().isoformat()),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'sales.db')
+
+
+def legacy_streamlit_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(STREAMLIT_SALE)
+    conn.execute(STREAMLIT_RULE)
+    conn.executemany('''
+        INSERT INTO sale (id, user_id, customer_name, product_name, amount, commission_amount, sale_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', SALES)
+    conn.executemany('INSERT INTO commission_rule (product_name, commission_rate) VALUES (?, ?)',
+                     [('Laptop', 0.05), ('laptop ', 0.06), ('Software License', 0.08)])
+    conn.commit()
+    return conn
+
+
+def sale_names(conn):
+    return conn.execute('''
+        SELECT s.id, c.name, p.name FROM main.sale s
+        JOIN customer c ON c.id = s.customer_id
+        JOIN product p ON p.id = s.product_id
+        ORDER BY s.id
+    ''').fetchall()
+
+
+def test_rebuilds_hot_table_and_dedupes_names(db_path):
+    conn = legacy_streamlit_db(db_path)
+    migrate_to_dimensions(conn, SalePartitions(db_path))
+
+    assert sale_names(conn) == [
+        (1, 'Acme Corp', 'Laptop'),
+        (2, 'Acme Corp', 'Laptop'),
+        (3, 'Globex', 'Software License'),
+        (4, 'Initech', 'Laptop'),
+    ]
+    assert conn.execute('SELECT COUNT(*) FROM customer').fetchone()[0] == 3
+    assert conn.execute('SELECT COUNT(*) FROM product').fetchone()[0] == 2
+    # Only the newest rule per product survives
+    assert conn.execute('''
+        SELECT p.name, r.commission_rate FROM commission_rule r JOIN product p ON p.id = r.product_id
+        ORDER BY p.name
+    ''').fetchall() == [('Laptop', 0.06), ('Software License', 0.08)]
+
+
+def test_keeps_autoincrement_high_water_mark(db_path):
+    conn = legacy_streamlit_db(db_path)
+    conn.execute('DELETE FROM sale WHERE id = 4')
+    conn.commit()
+    migrate_to_dimensions(conn, SalePartitions(db_path))
+
+    conn.execute("INSERT INTO customer (name) VALUES ('New')")
+    conn.execute('''
+        INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+        VALUES (2, last_insert_rowid(), 1, 10, 1, '2024-01-01')
+    ''')
+    assert conn.execute('SELECT MAX(id) FROM sale').fetchone()[0] == 5
+
+
+def test_rebuilds_legacy_archives(db_path, tmp_path):
+    conn = legacy_streamlit_db(db_path)
+    partitions = SalePartitions(db_path, archive_dir=str(tmp_path / 'archive'))
+    assert partitions.archive_closed_periods(conn) == ['2023q1', '2023q2']
+
+    migrate_to_dimensions(conn, partitions)
+
+    assert sale_names(conn) == [(4, 'Initech', 'Laptop')]
+    archived = partitions.execute(conn, '''
+        SELECT s.id, c.name, p.name FROM {sale} s
+        JOIN customer c ON c.id = s.customer_id
+        JOIN product p ON p.id = s.product_id
+    ''')
+    assert sorted(archived) == [
+        (1, 'Acme Corp', 'Laptop'),
+        (2, 'Acme Corp', 'Laptop'),
+        (3, 'Globex', 'Software License'),
+        (4, 'Initech', 'Laptop'),
+    ]
+    # Archives are sealed again and the catalog still matches them
+    for name in ('2023q1', '2023q2'):
+        path = os.path.join(partitions.archive_dir, f'sale_{name}.db')
+        assert os.stat(path).st_mode & 0o222 == 0
+    assert partitions.archived_totals(conn)[:3] == (3, 3500, 190)
+
+
+def test_preserves_flask_model_columns(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(FLASK_SALE)
+    conn.execute('''
+        INSERT INTO sale (id, user_id, customer_name, product_name, amount, sale_date, commission_rate,
+                          commission_amount)
+        VALUES (1, 1, 'Acme Corp', 'Laptop', 1000, ?, 0.07, NULL)
+    ''', (date.today().isoformat(),))
+    conn.commit()
+
+    migrate_to_dimensions(conn, SalePartitions(db_path))
+
+    columns = {row[1]: row for row in conn.execute('PRAGMA table_info(sale)')}
+    assert 'commission_rate' in columns
+    assert 'customer_name' not in columns and 'customer_id' in columns
+    assert columns['commission_amount'][3] == 0  # still nullable
+    assert conn.execute(
+        'SELECT commission_rate, commission_amount FROM sale WHERE id = 1'
+    ).fetchone() == (0.07, None)
+
+
+def test_second_run_is_a_no_op(db_path):
+    conn = legacy_streamlit_db(db_path)
+    partitions = SalePartitions(db_path)
+    migrate_to_dimensions(conn, partitions)
+    schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'sale'").fetchone()
+    before = sale_names(conn)
+
+    migrate_to_dimensions(conn, partitions)
+
+    assert conn.execute("SELECT sql FROM sqlite_master WHERE name = 'sale'").fetchone() == schema
+    assert sale_names(conn) == before
+
+
+def test_dimension_id_for_creates_once(db_path):
+    conn = sqlite3.connect(db_path)
+    migrate_to_dimensions(conn, SalePartitions(db_path))
+    customers = Dimension('customer')
+
+    first = customers.id_for('Acme Corp', conn)
+    assert customers.id_for(' acme corp ', conn) == first
+    assert customers.name_of(first) == 'Acme Corp'
+    assert conn.execute('SELECT COUNT(*) FROM customer').fetchone()[0] == 1
+
+
+def test_dimension_names_for_reads_only_uncached_ids(db_path, monkeypatch):
+    conn = sqlite3.connect(db_path)
+    migrate_to_dimensions(conn, SalePartitions(db_path))
+    conn.executemany('INSERT INTO customer (name) VALUES (?)', [(f'Customer {n}',) for n in range(1200)])
+    conn.commit()
+    monkeypatch.setattr('backend.dimensions.LOOKUP_CHUNK', 2)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    customers = Dimension('customer')
+
+    assert customers.names_for([3, 1, 5, 3], conn) == {3: 'Customer 2', 1: 'Customer 0', 5: 'Customer 4'}
+    assert len(statements) == 2
+    assert all('WHERE id IN' in sql for sql in statements)
+
+    statements.clear()
+    assert customers.names_for([1, 5], conn) == {1: 'Customer 0', 5: 'Customer 4'}
+    assert customers.id_for('Customer 2', conn) == 3
+    assert statements == []
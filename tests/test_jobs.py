@@ -0,0 +1,127 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from backend.dimensions import SALE_DDL
+from backend.job_handlers import ARCHIVE_PERIODS, SALES_EXPORT, archive_periods, validate_params
+from backend.jobs import CronSchedule, JobScheduler
+from backend.partitions import SalePartitions
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = JobScheduler(str(tmp_path / 'jobs.db'), output_dir=str(tmp_path / 'reports'), lease=60)
+    scheduler.register('noop', lambda ctx: None)
+    return scheduler
+
+
+def expire(scheduler, job_id):
+    conn = scheduler._connect()
+    try:
+        conn.execute("UPDATE job SET heartbeat_at = '2000-01-01 00:00:00' WHERE id = ?", (job_id,))
+    finally:
+        conn.close()
+    scheduler._expire_leases()
+
+
+def test_expired_run_cannot_overwrite_its_replacement(scheduler):
+    job_id = scheduler.enqueue('noop')
+    assert scheduler._claim()[3] == 1
+    expire(scheduler, job_id)
+    assert scheduler.status(job_id)['status'] == 'queued'
+    assert scheduler._claim()[3] == 2
+
+    # The first run comes back to life: its reports and outcomes are ignored
+    assert scheduler._report(job_id, 1, 0.5, 'stale') is True
+    scheduler._finish(job_id, 1, 'failed', error='stale failure')
+    scheduler._retry(job_id, 1, RuntimeError('stale retry'))
+    job = scheduler.status(job_id)
+    assert (job['status'], job['attempts'], job['message']) == ('running', 2, None)
+
+    assert scheduler._report(job_id, 2, 0.5, 'halfway') is False
+    scheduler._finish(job_id, 2, 'done', result={'ok': True})
+    job = scheduler.status(job_id)
+    assert (job['status'], job['result'], job['progress']) == ('done', {'ok': True}, 1)
+
+
+def test_cancel_is_reported_to_the_running_attempt(scheduler):
+    job_id = scheduler.enqueue('noop')
+    scheduler._claim()
+    assert scheduler.cancel(job_id)
+    assert scheduler._report(job_id, 1, 0.1, None) is True
+
+
+@pytest.mark.parametrize('expression, after, expected', [
+    ('0 2 1 * *', datetime(2024, 1, 15, 10, 0), datetime(2024, 2, 1, 2, 0)),
+    ('30 3 * * 0', datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 7, 3, 30)),
+    ('15 1 * * *', datetime(2024, 1, 1, 1, 15), datetime(2024, 1, 2, 1, 15)),
+    ('0 0 13 * 5', datetime(2024, 1, 1), datetime(2024, 1, 5)),  # day OR weekday
+    ('*/20 * * * *', datetime(2024, 1, 1, 0, 41), datetime(2024, 1, 1, 1, 0)),
+])
+def test_cron_next_after(expression, after, expected):
+    assert CronSchedule(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize('kind, params, expected', [
+    ('monthly_statements', {'month': '2024-03', 'user_id': 4.0}, {'month': '2024-03', 'user_id': 4}),
+    ('sales_export', {'start': '2024-01-01', 'end': None}, {'start': '2024-01-01'}),
+    ('rebuild_rollups', {}, {}),
+])
+def test_validate_params_normalises(kind, params, expected):
+    assert validate_params(kind, params) == expected
+
+
+@pytest.mark.parametrize('kind, params, message', [
+    (SALES_EXPORT, {'bogus': 1}, 'Unknown params for sales_export: bogus'),
+    (ARCHIVE_PERIODS, {'today': '2024-01-01'}, 'expected: none'),
+    ('rebuild_rollups', {'on_done': 'x'}, 'Unknown params'),
+    ('monthly_statements', {'month': '2024-13'}, 'month must be a YYYY-MM month'),
+    ('monthly_statements', {'month': 202403}, 'month must be'),
+    (SALES_EXPORT, {'start': '01/02/2024'}, 'start must be a YYYY-MM-DD date'),
+    (SALES_EXPORT, {'user_id': '3'}, 'user_id must be a user id'),
+    (SALES_EXPORT, {'user_id': True}, 'user_id must be a user id'),
+])
+def test_validate_params_rejects(kind, params, message):
+    with pytest.raises(ValueError, match=message):
+        validate_params(kind, params)
+
+
+class RecordingContext:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.reports = []
+
+    def progress(self, done, total=None, message=None):
+        self.reports.append((done, total, message))
+
+
+def test_archive_periods_reports_progress_per_period(tmp_path):
+    partitions = SalePartitions(str(tmp_path / 'sales.db'))
+    conn = sqlite3.connect(partitions.db_path)
+    conn.execute(SALE_DDL.format(table='sale'))
+    conn.executemany('''
+        INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+        VALUES (1, 1, 1, 100, 10, ?)
+    ''', [('2023-11-02',), ('2024-01-15',)])
+    conn.commit()
+    conn.close()
+
+    ctx = RecordingContext(partitions.db_path)
+    assert archive_periods(ctx, partitions) == {'partitions': ['2023q4', '2024q1']}
+    assert ctx.reports == [(1, 2, '2023q4 archived'), (2, 3, '2024q1 archived')]
+
+
+def test_job_api_rejects_bad_input(client, admin_headers):
+    def post(body):
+        return client.post('/api/jobs', json=body, headers=admin_headers)
+
+    assert post({'kind': SALES_EXPORT, 'params': {'bogus': 1}}).status_code == 400
+    assert post({'kind': 'monthly_statements', 'params': {'month': 'March'}}).status_code == 400
+    assert post({'kind': SALES_EXPORT, 'priority': 'high'}).status_code == 400
+    assert post({'kind': SALES_EXPORT, 'priority': None}).status_code == 400
+
+    response = post({'kind': 'monthly_statements', 'params': {'month': '2024-03'}, 'priority': 5})
+    assert response.status_code == 202
+    job = client.get(f"/api/jobs/{response.json['id']}", headers=admin_headers).json
+    assert (job['params'], job['priority']) == ({'month': '2024-03'}, 5)
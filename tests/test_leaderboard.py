@@ -0,0 +1,103 @@
+import random
+import threading
+import time
+
+import pytest
+
+from backend.leaderboard import ALL_TIME, LeaderboardStore, RankedSet
+
+
+def expected_order(scores):
+    """The reference ordering: score descending, ties broken by member"""
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_ranked_set_matches_sorted_dict(seed):
+    rng = random.Random(seed)
+    ranked, scores = RankedSet(), {}
+    for step in range(3000):
+        member = f'm{rng.randrange(200)}'
+        if rng.random() < 0.1:
+            ranked.discard(member)
+            scores.pop(member, None)
+        else:
+            delta = rng.choice([rng.randint(-50, 100), 0, 10])
+            scores[member] = scores.get(member, 0) + delta
+            assert ranked.add(member, delta) == scores[member]
+
+        if step % 100 == 0:
+            order = expected_order(scores)
+            assert len(ranked) == len(scores)
+            assert ranked.range(0, len(order) + 5) == order
+            for rank, (name, score) in enumerate(order, 1):
+                assert ranked.rank(name) == rank
+                assert ranked.score(name) == score
+            start = rng.randrange(len(order) + 1)
+            assert ranked.range(start, 7) == order[start:start + 7]
+
+
+def test_ranked_set_edges():
+    ranked = RankedSet()
+    assert ranked.range() == [] and ranked.rank('x') is None
+    ranked.add('b', 5)
+    ranked.add('a', 5)
+    ranked.add('c', 9)
+    assert ranked.range() == [('c', 9), ('a', 5), ('b', 5)]
+    assert ranked.range(-1) == [] and ranked.range(3) == [] and ranked.range(0, 0) == []
+    ranked.discard('missing')
+    ranked.discard('c')
+    assert 'c' not in ranked and ranked.rank('b') == 2
+
+
+def test_store_ranks_per_period_dimension_and_metric():
+    store = LeaderboardStore()
+    store.load([
+        ('alice', 'Laptop', 'Acme', 100, 10, '2024-01-05'),
+        ('bob', 'Phone', 'Acme', 300, 15, '2024-01-20'),
+        ('alice', 'Phone', 'Globex', 250, 25, '2024-02-01'),
+    ])
+    store.record_sale('bob', 'Laptop', 'Globex', 50, 5, '2024-02-02')
+
+    assert store.loaded
+    assert store.top('rep') == [('alice', 350.0), ('bob', 350.0)]
+    assert store.top('rep', period='2024-02', metric='commission') == [('alice', 25.0), ('bob', 5.0)]
+    assert store.top('product', 1) == [('Phone', 550.0)]
+    assert store.rank('customer', 'Globex', ALL_TIME) == (2, 300.0, 2)
+    assert store.rank('rep', 'carol') is None
+    assert store.periods() == ['2024-02', '2024-01']
+
+    store.clear()
+    assert not store.loaded and store.top('rep') == []
+
+
+def test_sales_racing_the_initial_load_are_counted_once():
+    store = LeaderboardStore()
+    rows = [(1, 'alice', 'Laptop', 'Acme', 100, 10, '2024-01-05'),
+            (2, 'bob', 'Phone', 'Acme', 300, 15, '2024-01-20')]
+    # Committed before the scan: its add_sale came too early to apply it...
+    store.record_sale('bob', 'Phone', 'Acme', 300, 15, '2024-01-20', sale_id=2)
+    recorders = []
+
+    def fetch():
+        # ...or records while the scan runs: sale 2 is in the scan, sale 3 isn't
+        for sale in ((2, 300), (3, 50)):
+            recorder = threading.Thread(target=store.record_sale, args=(
+                'bob', 'Phone', 'Acme', sale[1], 5, '2024-01-21'), kwargs={'sale_id': sale[0]})
+            recorder.start()
+            recorders.append(recorder)
+        time.sleep(0.05)
+        assert all(recorder.is_alive() for recorder in recorders)  # waiting for the load
+        return rows
+
+    store.ensure_loaded(fetch)
+    for recorder in recorders:
+        recorder.join(5)
+
+    assert store.sale_id == 2
+    assert store.top('rep') == [('bob', 350.0), ('alice', 100.0)]
+    store.ensure_loaded(lambda: pytest.fail('already loaded'))
+
+    store.clear()
+    store.ensure_loaded(lambda: [])
+    assert store.loaded and store.sale_id == 0
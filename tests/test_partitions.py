@@ -0,0 +1,80 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from backend.dimensions import SALE_DDL
+from backend.partitions import SalePartitions
+
+TODAY = date(2024, 5, 20)
+
+SALES = [
+    (1, 1, 1, 100, 10, '2023-11-02'),
+    (1, 1, 1, 200, 20, '2024-01-15'),
+    (2, 1, 1, 300, 30, '2024-02-01'),
+    (2, 1, 1, 400, 40, '2024-05-10'),
+]
+
+
+@pytest.fixture
+def partitions(tmp_path):
+    return SalePartitions(str(tmp_path / 'sales.db'))
+
+
+@pytest.fixture
+def conn(partitions):
+    conn = sqlite3.connect(partitions.db_path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute(SALE_DDL.format(table='sale'))
+    conn.executemany('''
+        INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', SALES)
+    conn.commit()
+    return conn
+
+
+def all_sales(partitions, conn):
+    return sorted(partitions.execute(conn, 'SELECT id, amount FROM {sale}'))
+
+
+def test_archives_closed_periods(partitions, conn):
+    assert partitions.archive_closed_periods(conn, TODAY) == ['2023q4', '2024q1']
+
+    assert conn.execute('SELECT id FROM sale').fetchall() == [(4,)]
+    assert all_sales(partitions, conn) == [(1, 100), (2, 200), (3, 300), (4, 400)]
+    assert partitions.archived_totals(conn)[:3] == (3, 600, 60)
+    assert partitions.archived_totals(conn, user_id=2)[:3] == (1, 300, 30)
+
+
+def test_archival_interrupted_after_archive_commit_recovers(partitions, conn, monkeypatch):
+    # Die after the archive file committed but before the hot rows are removed
+    def crash(cursor, name):
+        raise RuntimeError('crash')
+    monkeypatch.setattr(partitions, '_refresh_catalog', crash)
+    with pytest.raises(RuntimeError):
+        partitions.archive_closed_periods(conn, TODAY)
+    monkeypatch.undo()
+
+    # Rows are still hot and the half-written archive isn't catalogued: nothing lost or doubled
+    assert conn.execute('SELECT COUNT(*) FROM sale').fetchone()[0] == 4
+    assert all_sales(partitions, conn) == [(1, 100), (2, 200), (3, 300), (4, 400)]
+
+    assert partitions.archive_closed_periods(conn, TODAY) == ['2023q4', '2024q1']
+    assert all_sales(partitions, conn) == [(1, 100), (2, 200), (3, 300), (4, 400)]
+    assert partitions.archived_totals(conn)[:3] == (3, 600, 60)
+
+
+def test_stale_catalog_heals_on_refresh(partitions, conn, monkeypatch):
+    partitions.archive_closed_periods(conn, TODAY)
+
+    # Archive commits the delete, then the catalog refresh is lost
+    monkeypatch.setattr(partitions, '_refresh_catalog', lambda cursor, name: None)
+    assert partitions.delete_user_sales(conn, 1) == 2
+    monkeypatch.undo()
+    assert partitions.archived_totals(conn)[0] == 3
+
+    for name in partitions.names(conn):
+        partitions.refresh_partition(conn, name)
+    assert partitions.archived_totals(conn)[:3] == (1, 300, 30)
+    assert partitions.user_partitions(conn, 1) == []
@@ -0,0 +1,133 @@
+import queue
+import sqlite3
+from datetime import date
+
+import pytest
+
+from backend.dimensions import SALE_DDL
+from backend.partitions import SalePartitions
+from backend.reaper import (
+    INSERT_LIVE_USER_SALE, SalesReaper, VISIBLE_SALE_USER, ensure_schema, soft_delete_user
+)
+from backend.write_queue import QueueFullError, WriteQueue
+
+TODAY = date(2024, 5, 20)
+
+VISIBLE_TOTALS = f'SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM sale WHERE {VISIBLE_SALE_USER}'
+JOINED_TOTALS = '''
+    SELECT COUNT(*), COALESCE(SUM(s.amount), 0)
+    FROM sale s JOIN user u ON s.user_id = u.id WHERE u.deleted_at IS NULL
+'''
+
+
+@pytest.fixture
+def partitions(tmp_path):
+    return SalePartitions(str(tmp_path / 'sales.db'))
+
+
+@pytest.fixture
+def conn(partitions):
+    conn = sqlite3.connect(partitions.db_path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('CREATE TABLE user (id INTEGER PRIMARY KEY, username TEXT NOT NULL)')
+    ensure_schema(conn)
+    conn.execute(SALE_DDL.format(table='sale'))
+    conn.executemany('INSERT INTO user (id, username) VALUES (?, ?)', [(1, 'ann'), (2, 'bob')])
+    conn.executemany('''
+        INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date)
+        VALUES (?, 1, 1, ?, 0, ?)
+    ''', [(1, 100, '2024-01-15'), (1, 200, '2024-05-01'), (1, 300, '2024-05-02'), (2, 400, '2024-05-03')])
+    conn.commit()
+    partitions.archive_closed_periods(conn, TODAY)
+    return conn
+
+
+@pytest.fixture
+def write_queue(partitions):
+    write_queue = WriteQueue(partitions.db_path)
+    yield write_queue
+    write_queue.close()
+
+
+def sale(user_id, amount):
+    return (user_id, 1, 1, amount, 0, TODAY.isoformat(), user_id)
+
+
+def run_reaper(reaper, purges):
+    """Start the reaper (which resumes pending purges) and wait for that many to finish"""
+    done = queue.Queue()
+    reaper.on_done = done.put
+    reaper.start()
+    return [done.get(timeout=5) for _ in range(purges)]
+
+
+def test_soft_delete_hides_sales_at_once(partitions, conn):
+    soft_delete_user(conn, 1, partitions)
+
+    assert conn.execute(VISIBLE_TOTALS).fetchone() == (1, 400)
+    assert partitions.archived_totals(conn, user_filter=VISIBLE_SALE_USER)[:2] == (0, 0)
+    assert conn.execute('SELECT total_sales, status FROM user_purge WHERE user_id = 1').fetchone() == (3, 'pending')
+
+
+def test_reaper_purges_hot_and_archived_sales(partitions, conn, write_queue):
+    soft_delete_user(conn, 1, partitions)
+    reaper = SalesReaper(partitions.db_path, partitions, write_queue, chunk_size=1, pause=0)
+
+    assert run_reaper(reaper, 1) == [1]
+    assert conn.execute('SELECT user_id FROM sale').fetchall() == [(2,)]
+    assert partitions.user_partitions(conn, 1) == []
+    assert conn.execute('SELECT id FROM user').fetchall() == [(2,)]
+    assert conn.execute('SELECT removed_sales, status FROM user_purge WHERE user_id = 1').fetchone() == (3, 'done')
+    assert reaper.progress(conn) == []
+
+
+def test_deleted_user_cannot_add_sales(partitions, conn, write_queue):
+    assert write_queue.execute(INSERT_LIVE_USER_SALE, sale(1, 50)).rowcount == 1
+    soft_delete_user(conn, 1, partitions)
+    assert write_queue.execute(INSERT_LIVE_USER_SALE, sale(1, 60)).rowcount == 0
+
+    reaper = SalesReaper(partitions.db_path, partitions, write_queue, pause=0)
+    run_reaper(reaper, 1)
+    # An open session of the purged user still can't write, and the totals agree
+    assert write_queue.execute(INSERT_LIVE_USER_SALE, sale(1, 70)).rowcount == 0
+    assert write_queue.execute(INSERT_LIVE_USER_SALE, sale(2, 80)).rowcount == 1
+    assert conn.execute(VISIBLE_TOTALS).fetchone() == conn.execute(JOINED_TOTALS).fetchone() == (2, 480)
+
+
+def test_stats_ignore_sales_of_purged_users(conn):
+    # e.g. rows written by an older version after the purge removed the user
+    conn.execute("INSERT INTO sale (user_id, customer_id, product_id, amount, commission_amount, sale_date) "
+                 "VALUES (9, 1, 1, 999, 0, '2024-05-04')")
+    assert conn.execute(VISIBLE_TOTALS).fetchone() == conn.execute(JOINED_TOTALS).fetchone()
+
+
+class FlakyQueue:
+    """Stands in for the WriteQueue: rejects the first `failures` writes"""
+
+    def __init__(self, write_queue, failures):
+        self.write_queue = write_queue
+        self.failures = failures
+
+    def execute(self, sql, params=(), timeout=30):
+        if self.failures:
+            self.failures -= 1
+            raise QueueFullError('queue full')
+        return self.write_queue.execute(sql, params, timeout)
+
+
+def test_reaper_survives_failing_error_write(partitions, conn, write_queue):
+    soft_delete_user(conn, 1, partitions)
+    soft_delete_user(conn, 2, partitions)
+    # User 1's purge fails, and so does recording that failure
+    reaper = SalesReaper(partitions.db_path, partitions, FlakyQueue(write_queue, 2), pause=0)
+
+    assert run_reaper(reaper, 1) == [2]
+    assert reaper._thread.is_alive()
+    assert [row[0] for row in reaper.progress(conn)] == [1]
+
+    # The same thread retries it
+    done = queue.Queue()
+    reaper.on_done = done.put
+    reaper.enqueue(1)
+    assert done.get(timeout=5) == 1
+    assert reaper.progress(conn) == []
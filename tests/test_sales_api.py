@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+SALE = '''
+    INSERT INTO sale (user_id, customer_id, product_id, amount, sale_date, commission_rate, commission_amount)
+    VALUES (?, 1, ?, ?, ?, 0.05, ?)
+'''
+
+
+def add_catalog(api_db):
+    api_db.execute("INSERT INTO customer (name) VALUES ('Acme')")
+    api_db.executemany('INSERT INTO product (name) VALUES (?)', [('Laptop',), ('Phone',)])
+
+
+def test_sales_pages_follow_the_cursor(client, admin_headers, api_db):
+    add_catalog(api_db)
+    # Three sales per day, so pages split days and ties are broken by id
+    api_db.executemany(SALE, [
+        (1, 1, n, (date(2024, 1, 1) + timedelta(days=n // 3)).isoformat(), n * 0.05) for n in range(25)
+    ])
+    api_db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        response = client.get('/api/sales?limit=7' + (f'&cursor={cursor}' if cursor else ''),
+                              headers=admin_headers)
+        assert response.status_code == 200
+        seen += [sale['id'] for sale in response.json]
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert pages == 4
+    assert seen == list(range(25, 0, -1))
+
+
+def test_exact_last_page_ends_with_an_empty_page(client, admin_headers, api_db):
+    add_catalog(api_db)
+    api_db.executemany(SALE, [(1, 1, n, '2024-01-01', None) for n in range(4)])
+    api_db.commit()
+
+    first = client.get('/api/sales?limit=4', headers=admin_headers)
+    assert len(first.json) == 4
+    last = client.get(f"/api/sales?limit=4&cursor={first.headers['X-Next-Cursor']}", headers=admin_headers)
+    assert last.json == []
+    assert 'X-Next-Cursor' not in last.headers
+
+
+def test_invalid_cursor_is_rejected(client, admin_headers):
+    assert client.get('/api/sales?cursor=yesterday', headers=admin_headers).status_code == 400
+
+
+def test_summary_counts_sales_without_commission(client, admin_headers, api_db):
+    add_catalog(api_db)
+    api_db.executemany(SALE, [
+        (1, 1, 100, '2024-01-01', None),
+        (1, 2, 200, '2024-01-02', 10.0),
+        (1, 2, 300, '2024-01-03', None),
+    ])
+    api_db.commit()
+
+    response = client.get('/api/commission/summary?group=product', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json == [
+        {'product_name': 'Phone', 'sales': 2, 'amount': 500.0, 'commission': 10.0},
+        {'product_name': 'Laptop', 'sales': 1, 'amount': 100.0, 'commission': 0},
+    ]
@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+import pytest
+
+from backend.models import Sale
+from backend.simulator import SalesHistory, evaluate, simulate
+
+REPS = ['ann', 'bob', 'cy']
+
+
+def scalar_commission(amount, product_id, current, rules):
+    """The per-sale path: the product's rule applies within its bounds, via Sale.calculate_commission"""
+    for rule in rules:
+        maximum = rule.get('max_amount')
+        if (rule['product_id'] == product_id and amount >= (rule.get('min_amount') or 0)
+                and (maximum is None or amount <= maximum)):
+            return Sale(amount=amount, commission_rate=rule['commission_rate'] / 100).calculate_commission(), True
+    return current, False
+
+
+def scalar_evaluate(sales, rules):
+    by_rep, by_product, repriced = {}, {}, 0
+    for rep, product_id, amount, current in sales:
+        commission, matched = scalar_commission(amount, product_id, current, rules)
+        repriced += matched
+        by_rep[rep] = by_rep.get(rep, 0) + commission - current
+        by_product[product_id] = by_product.get(product_id, 0) + commission - current
+    return repriced, by_rep, by_product
+
+
+def history_of(sales):
+    rep_codes, product_ids, amounts, commissions = zip(*sales) if sales else ((), (), (), ())
+    return SalesHistory(REPS, rep_codes, product_ids, amounts, commissions)
+
+
+def test_matches_scalar_path_on_random_sales():
+    rng = random.Random(35)
+    rules = [
+        {'product_id': 1, 'commission_rate': 10, 'min_amount': 0, 'max_amount': None},
+        {'product_id': 2, 'commission_rate': 7.5, 'min_amount': 1000, 'max_amount': 5000},
+        {'product_id': 4, 'commission_rate': 12, 'min_amount': None, 'max_amount': 2500},
+    ]
+    # Amounts on and either side of every bound, plus random ones
+    amounts = [0, 999.99, 1000, 1000.01, 2500, 2500.01, 4999.99, 5000, 5000.01]
+    sales = [
+        (rng.randrange(len(REPS)), rng.randrange(6),
+         rng.choice(amounts) if n % 2 else round(rng.uniform(0, 8000), 2), round(rng.uniform(0, 500), 2))
+        for n in range(2000)
+    ]
+    history = history_of(sales)
+
+    result = evaluate(history, rules, 'candidate')
+    repriced, by_rep, by_product = scalar_evaluate(sales, rules)
+
+    assert result.name == 'candidate'
+    assert result.repriced_sales == repriced
+    np.testing.assert_allclose(result.by_rep_delta, [by_rep.get(code, 0) for code in range(len(REPS))])
+    np.testing.assert_allclose(result.by_product_delta,
+                               [by_product.get(product_id, 0) for product_id in range(history.product_count)],
+                               atol=1e-9)
+    assert result.current_total == pytest.approx(sum(sale[3] for sale in sales))
+    assert result.simulated_total == pytest.approx(result.current_total + sum(by_rep.values()))
+
+
+@pytest.mark.parametrize('amount, repriced', [
+    (999.99, False), (1000, True), (5000, True), (5000.01, False),
+])
+def test_tier_bounds_are_inclusive(amount, repriced):
+    rules = [{'product_id': 0, 'commission_rate': 10, 'min_amount': 1000, 'max_amount': 5000}]
+    result = evaluate(history_of([(0, 0, amount, 1.0)]), rules)
+
+    assert result.repriced_sales == int(repriced)
+    expected = scalar_commission(amount, 0, 1.0, rules)[0]
+    assert result.simulated_total == pytest.approx(expected)
+
+
+def test_unruled_products_keep_their_commission():
+    history = history_of([(0, 0, 100, 5), (1, 1, 200, 8)])
+    result = evaluate(history, [{'product_id': 1, 'commission_rate': 10, 'max_amount': None},
+                                {'product_id': 9, 'commission_rate': 50, 'max_amount': None}])
+
+    assert result.repriced_sales == 1
+    assert list(result.by_product_delta) == [0, 12]
+    assert list(result.by_rep_delta) == [0, 12, 0]
+    assert (result.current_total, result.simulated_total) == (13, 25)
+
+
+def test_empty_history():
+    history = history_of([])
+    assert len(history) == 0
+    result = evaluate(history, [{'product_id': 0, 'commission_rate': 10, 'max_amount': None}])
+
+    assert (result.repriced_sales, result.current_total, result.simulated_total) == (0, 0, 0)
+    assert list(result.by_rep_delta) == [0, 0, 0]
+    assert list(result.by_product_delta) == [0]
+
+
+def test_simulate_keeps_scenario_order():
+    history = history_of([(0, 0, 100, 5)])
+    scenarios = {f'{rate}%': [{'product_id': 0, 'commission_rate': rate, 'max_amount': None}]
+                 for rate in (1, 20, 5)}
+
+    results = simulate(history, scenarios, max_workers=3)
+    assert [(result.name, result.simulated_total) for result in results] == [('1%', 1), ('20%', 20), ('5%', 5)]
+    assert simulate(history, {}) == []
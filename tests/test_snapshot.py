@@ -0,0 +1,102 @@
+import sqlite3
+import time
+
+import pytest
+
+from backend.snapshot import ReportingSnapshot
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'primary.db')
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+    conn.execute('INSERT INTO item DEFAULT VALUES')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def add_item(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute('INSERT INTO item DEFAULT VALUES')
+    conn.commit()
+    conn.close()
+
+
+def count(snapshot):
+    conn = snapshot.connect()
+    try:
+        return conn.execute('SELECT COUNT(*) FROM item').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_first_connect_copies_and_copy_is_read_only(db_path):
+    snapshot = ReportingSnapshot(db_path)
+    assert count(snapshot) == 1
+    conn = snapshot.connect()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute('INSERT INTO item DEFAULT VALUES')
+    conn.close()
+
+
+def test_stale_copy_is_refreshed_on_connect(db_path):
+    snapshot = ReportingSnapshot(db_path, max_staleness=0.05)
+    assert count(snapshot) == 1
+    add_item(db_path)
+    assert count(snapshot) == 1
+    time.sleep(0.06)
+    assert count(snapshot) == 2
+
+
+def test_invalidate_refreshes_in_the_background(db_path):
+    snapshot = ReportingSnapshot(db_path)
+    assert count(snapshot) == 1
+    written_at = time.monotonic()
+    add_item(db_path)
+
+    # Hold the copy up: readers must keep getting the old snapshot meanwhile
+    with snapshot._refreshing:
+        snapshot.invalidate()
+        assert not snapshot.is_stale()
+        assert count(snapshot) == 1
+        assert not snapshot.covers(written_at)
+
+    wait_for(lambda: snapshot.covers(written_at))
+    assert count(snapshot) == 2
+
+
+def test_invalidate_during_a_copy_refreshes_again(db_path):
+    snapshot = ReportingSnapshot(db_path)
+    count(snapshot)
+    # A copy that started before the write doesn't cover it
+    with snapshot._refreshing:
+        written_at = time.monotonic()
+        add_item(db_path)
+        snapshot.invalidate()
+        snapshot.invalidate()  # coalesced with the pending request
+        assert not snapshot.covers(written_at)
+    wait_for(lambda: snapshot.covers(written_at))
+    assert count(snapshot) == 2
+
+
+def test_writes_trigger_a_background_refresh(db_path):
+    snapshot = ReportingSnapshot(db_path, refresh_after_writes=2)
+    count(snapshot)
+    written_at = time.monotonic()
+    add_item(db_path)
+    snapshot.note_writes()
+    time.sleep(0.05)
+    assert not snapshot.covers(written_at)
+    snapshot.note_writes()
+    wait_for(lambda: snapshot.covers(written_at))
+    assert count(snapshot) == 2
@@ -0,0 +1,88 @@
+import math
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from backend.timeseries import bucket_expression, choose_bucket, downsample_series, lttb_indices
+
+DAYS = [date(2023, 12, 1) + timedelta(days=n) for n in range(800)]
+
+
+def buckets(bucket, days=DAYS):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE sale (sale_date DATE)')
+    conn.executemany('INSERT INTO sale VALUES (?)', [(day.isoformat(),) for day in days])
+    rows = conn.execute(f'SELECT sale_date, {bucket_expression(bucket)} FROM sale ORDER BY rowid').fetchall()
+    conn.close()
+    return {date.fromisoformat(day): date.fromisoformat(start) for day, start in rows}
+
+
+def test_week_buckets_start_on_monday():
+    for day, start in buckets('week').items():
+        assert start.weekday() == 0
+        assert 0 <= (day - start).days < 7
+
+
+def test_quarter_buckets_start_on_the_first_day_of_the_quarter():
+    for day, start in buckets('quarter').items():
+        assert start == date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+
+
+def test_day_and_month_buckets():
+    assert all(day == start for day, start in buckets('day').items())
+    assert all(start == day.replace(day=1) for day, start in buckets('month').items())
+
+
+def test_buckets_accept_timestamps():
+    conn = sqlite3.connect(':memory:')
+    assert conn.execute(f"SELECT {bucket_expression('week', 'd')} FROM (SELECT '2024-05-19 23:59:00' AS d)"
+                        ).fetchone() == ('2024-05-13',)
+    conn.close()
+
+
+def test_unknown_bucket_is_rejected():
+    with pytest.raises(ValueError):
+        bucket_expression('year')
+
+
+@pytest.mark.parametrize('days, bucket', [
+    (1, 'day'), (92, 'day'), (93, 'week'), (731, 'week'), (732, 'month'),
+    (366 * 15, 'month'), (366 * 15 + 1, 'quarter'),
+])
+def test_choose_bucket(days, bucket):
+    start = date(2020, 1, 1)
+    assert choose_bucket(start, start + timedelta(days=days - 1)) == bucket
+
+
+@pytest.mark.parametrize('n, threshold', [(10, 5), (1000, 100), (5000, 2000), (101, 3)])
+def test_lttb_keeps_ends_and_respects_threshold(n, threshold):
+    xs = list(range(n))
+    ys = [math.sin(x / 7) * 100 + x % 13 for x in xs]
+    indices = lttb_indices(xs, ys, threshold)
+
+    assert len(indices) == threshold
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert indices == sorted(set(indices))
+
+
+def test_lttb_keeps_spikes():
+    ys = [0.0] * 1000
+    ys[123], ys[777] = 500.0, -500.0
+    indices = lttb_indices(list(range(1000)), ys, 50)
+    assert 123 in indices and 777 in indices
+
+
+@pytest.mark.parametrize('n, threshold', [(0, 10), (5, 10), (10, 10), (10, 2)])
+def test_lttb_returns_everything_when_nothing_to_drop(n, threshold):
+    assert lttb_indices(list(range(n)), [1.0] * n, threshold) == list(range(n))
+
+
+def test_downsample_series_accepts_dates_and_strings():
+    values = [float(n % 17) for n in range(len(DAYS))]
+    dates, kept = downsample_series(DAYS, values, threshold=100)
+    assert len(dates) == len(kept) == 100
+    assert (dates[0], dates[-1]) == (DAYS[0], DAYS[-1])
+
+    strings = [day.isoformat() for day in DAYS]
+    assert downsample_series(strings, values, threshold=100)[0] == [day.isoformat() for day in dates]
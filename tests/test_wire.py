@@ -0,0 +1,102 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+from backend import wire
+from backend.wire import COLUMNAR_JSON, JSON, Table, table_response
+
+ROWS = [
+    (1, 'ann', '2024-01-02', 10),
+    (2, 'bob', '2024-01-03 09:30:00', 20),
+    (3, 'ann', None, 30),
+]
+
+
+@pytest.fixture
+def table():
+    return Table.from_rows(['id', 'salesperson', 'sale_date', 'amount'], ROWS,
+                           dictionary=('salesperson',), dates=('sale_date',), floats=('amount',))
+
+
+def respond(table, path='/', min_bytes=0, **headers):
+    app = Flask(__name__)
+    with app.test_request_context(path, headers=headers):
+        from flask import request
+        return table_response(table, request, min_bytes)
+
+
+def test_json_is_the_default(table):
+    response = respond(table)
+    assert response.mimetype == JSON
+    assert json.loads(response.get_data())[1] == {
+        'id': 2, 'salesperson': 'bob', 'sale_date': '2024-01-03 09:30:00', 'amount': 20,
+    }
+    assert response.headers['X-Row-Count'] == '3'
+
+
+def test_columnar_encodes_dictionaries_and_days(table):
+    body = json.loads(respond(table, Accept=COLUMNAR_JSON).get_data())
+    assert body['rows'] == 3
+    assert body['columns']['salesperson'] == [0, 1, 0]
+    assert body['dictionaries'] == {'salesperson': ['ann', 'bob']}
+    assert body['columns']['sale_date'] == [19724, 19725, None]
+    assert body['encodings'] == {'salesperson': 'dictionary', 'sale_date': 'days'}
+
+
+def test_format_param_wins_over_accept(table):
+    assert respond(table, '/?format=columnar', Accept=JSON).mimetype == COLUMNAR_JSON
+
+
+def test_unavailable_format_is_not_acceptable(table, monkeypatch):
+    monkeypatch.setattr(wire, 'pa', None)
+    assert respond(table, '/?format=arrow').status_code == 406
+    assert respond(table, '/?format=xml').status_code == 406
+    assert respond(table, Accept='application/vnd.apache.arrow.stream').status_code == 406
+
+
+def test_empty_table_encodes(table):
+    empty = Table.from_rows(table.names, [], dictionary=('salesperson',), dates=('sale_date',))
+    assert json.loads(respond(empty, Accept=COLUMNAR_JSON).get_data())['rows'] == 0
+    assert json.loads(respond(empty).get_data()) == []
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate', {'gzip', 'deflate'}),
+    ('GZIP;q=0.5, br;q=0', {'gzip'}),
+    ('*;q=1', {'*'}),
+    ('gzip;q=bad', set()),
+    (None, set()),
+])
+def test_accepted_encodings(header, expected):
+    assert wire.accepted_encodings(header) == expected
+
+
+def test_gzip_above_threshold_only(table, monkeypatch):
+    monkeypatch.setattr(wire, 'zstandard', None)
+    response = respond(table, **{'Accept-Encoding': 'gzip, zstd'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.get_data()))[0]['id'] == 1
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    small = respond(table, min_bytes=10 ** 6, **{'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Content-Encoding' not in respond(table, **{'Accept-Encoding': 'br'}).headers
+
+
+def test_zstd_preferred_when_available(table):
+    zstandard = pytest.importorskip('zstandard')
+    response = respond(table, **{'Accept-Encoding': 'gzip, zstd'})
+    assert response.headers['Content-Encoding'] == 'zstd'
+    body = zstandard.ZstdDecompressor().decompressobj().decompress(response.get_data())
+    assert json.loads(body)[0]['id'] == 1
+
+
+def test_arrow_round_trip(table):
+    pa = pytest.importorskip('pyarrow')
+    response = respond(table, '/?format=arrow')
+    result = pa.ipc.open_stream(response.get_data()).read_all()
+    assert result.column('salesperson').to_pylist() == ['ann', 'bob', 'ann']
+    assert result.column('amount').type == pa.float64()
+    assert str(result.column('sale_date')[0]) == '2024-01-02'
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from backend.write_queue import WriteQueue, _STOP
+
+INSERT = 'INSERT INTO item (name) VALUES (?)'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)')
+    conn.close()
+    return path
+
+
+def names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute('SELECT name FROM item ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def test_failed_statement_only_fails_its_own_future(db_path):
+    write_queue = WriteQueue(db_path, max_delay=0.05)
+    futures = [write_queue.submit(INSERT, (name,)) for name in ('a', 'a', 'b')]
+    write_queue.close()
+
+    assert futures[0].result().rowcount == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[1].result()
+    assert futures[2].result().rowcount == 1
+    assert names(db_path) == ['a', 'b']
+
+
+def test_writer_survives_failing_on_commit(db_path):
+    def on_commit(count):
+        raise RuntimeError('callback failed')
+    write_queue = WriteQueue(db_path, on_commit=on_commit)
+
+    assert write_queue.execute(INSERT, ('a',), timeout=5).rowcount == 1
+    assert write_queue.execute(INSERT, ('b',), timeout=5).rowcount == 1
+    write_queue.close()
+    assert names(db_path) == ['a', 'b']
+
+
+def test_writer_recovers_from_connect_failure(db_path, monkeypatch):
+    write_queue = WriteQueue(db_path)
+    connect = write_queue._connect
+    calls = []
+
+    def flaky_connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError('disk unavailable')
+        return connect()
+    monkeypatch.setattr(write_queue, '_connect', flaky_connect)
+
+    with pytest.raises(OSError):
+        write_queue.execute(INSERT, ('a',), timeout=5)
+    assert write_queue.execute(INSERT, ('b',), timeout=5).rowcount == 1
+    write_queue.close()
+    assert names(db_path) == ['b']
+
+
+def test_dead_writer_thread_is_restarted(db_path):
+    write_queue = WriteQueue(db_path)
+    write_queue.execute(INSERT, ('a',), timeout=5)
+
+    # Stop the writer behind the queue's back, as an error escaping _run would
+    write_queue._queue.put(_STOP)
+    write_queue._thread.join(5)
+    assert not write_queue._thread.is_alive()
+
+    assert write_queue.execute(INSERT, ('b',), timeout=5).rowcount == 1
+    write_queue.close()
+    assert names(db_path) == ['a', 'b']
+
+
+def test_aborted_transaction_fails_the_whole_batch(db_path):
+    conn = sqlite3.connect(db_path)
+    # Rolls back the whole transaction, as SQLITE_FULL or SQLITE_IOERR would
+    conn.execute('''
+        CREATE TRIGGER abort_batch BEFORE INSERT ON item WHEN NEW.name = 'boom'
+        BEGIN SELECT RAISE(ROLLBACK, 'disk full'); END
+    ''')
+    conn.close()
+    write_queue = WriteQueue(db_path, max_delay=0.05)
+    futures = [write_queue.submit(INSERT, (name,)) for name in ('a', 'boom', 'b')]
+    write_queue.close()
+
+    for future in futures:
+        with pytest.raises(sqlite3.Error):
+            future.result()
+    # Nothing was committed, so callers can safely retry every write
+    assert names(db_path) == []